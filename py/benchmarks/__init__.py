@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+                
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
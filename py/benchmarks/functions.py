@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Benchmark problems for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+from typing import Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def sphere(positions: np.ndarray) -> np.ndarray:
+    """Sphere function, minimum 0 at the origin. Takes a ``(N, dims)`` array."""
+    return np.sum(positions**2, axis=1)
+
+
+def rastrigin(positions: np.ndarray) -> np.ndarray:
+    """Rastrigin function, minimum 0 at the origin. Takes a ``(N, dims)`` array."""
+    return 10 * positions.shape[1] + np.sum(
+        positions**2 - 10 * np.cos(2 * np.pi * positions), axis=1
+    )
+
+
+def rosenbrock(positions: np.ndarray) -> np.ndarray:
+    """Rosenbrock function, minimum 0 at (1, ..., 1). Takes a ``(N, dims)`` array."""
+    return np.sum(
+        100 * (positions[:, 1:] - positions[:, :-1] ** 2) ** 2 + (1 - positions[:, :-1]) ** 2,
+        axis=1,
+    )
+
+
+def ackley(positions: np.ndarray) -> np.ndarray:
+    """Ackley function, minimum 0 at the origin. Takes a ``(N, dims)`` array."""
+    dims = positions.shape[1]
+    return (
+        -20 * np.exp(-0.2 * np.sqrt(np.sum(positions**2, axis=1) / dims))
+        - np.exp(np.sum(np.cos(2 * np.pi * positions), axis=1) / dims)
+        + 20
+        + np.e
+    )
+
+
+# Vectorized fitness, search bounds and target fitness by number of dimensions of every
+# function. The functions summing over the dimensions get a target per dimension, so that
+# low dimensional cases are not reached by the initial population already
+FUNCTIONS = {
+    "sphere": (sphere, (-5.12, 5.12), lambda dims: 1e-3 * dims),
+    "rastrigin": (rastrigin, (-5.12, 5.12), lambda dims: 1.0 * dims),
+    "rosenbrock": (rosenbrock, (-2.048, 2.048), lambda dims: 0.025 * dims),
+    "ackley": (ackley, (-32.768, 32.768), lambda dims: 1.0),
+}
+
+
+def multi_peak_matrix(
+    resolution: int, num_peaks: int, dims: int = 2, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Build a fitness matrix holding Gaussian peaks of different heights.
+
+    Peaks are kept four widths apart from each other and two widths from the edges, so
+    every one of them is a distinct dominant spot.
+
+    Args:
+        resolution (int): The extent of every dimension of the matrix.
+        num_peaks (int): The number of peaks.
+        dims (int, optional): The number of dimensions. Defaults to 2.
+        seed (int, optional): The seed of the peak layout. Defaults to 0.
+
+    Returns:
+        tuple: The ``float32`` matrix and the ``(num_peaks, dims)`` positions of the peaks.
+    """
+    rng = np.random.default_rng(seed)
+    width = resolution / (8 * num_peaks ** (1 / dims))
+    peaks = []
+    while len(peaks) < num_peaks:
+        peak = rng.integers(int(2 * width), resolution - int(2 * width), dims)
+        if all(np.linalg.norm(peak - other) > 4 * width for other in peaks):
+            peaks.append(peak)
+    peaks = np.array(peaks)
+
+    matrix = np.zeros((resolution,) * dims)
+    grid = np.ogrid[tuple(slice(0, resolution) for _ in range(dims))]
+    for peak, height in zip(peaks, np.linspace(1.0, 0.5, num_peaks)):
+        distance = sum((axis - coordinate) ** 2 for axis, coordinate in zip(grid, peak))
+        matrix = np.maximum(matrix, height * np.exp(-distance / (2 * width**2)))
+    return matrix.astype(np.float32), peaks
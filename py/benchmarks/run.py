@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""Benchmark suite of the Dispersive Fly Optimization (DFO) algorithm, with regression checks.
+
+Run from the ``py`` folder:
+
+    python -m benchmarks.run                  # compare against benchmarks/baseline.json
+    python -m benchmarks.run --update         # (re)write the baseline
+    python -m benchmarks.run --quick          # smaller grid, for a fast sanity check
+
+The process exits with status 1 when a metric regresses by more than the tolerance, or when
+a case is missing from the baseline.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from dfo.algo import DFO
+
+from .functions import FUNCTIONS, multi_peak_matrix
+
+logger = logging.getLogger(__name__)
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Whether a larger value of each metric is better, metrics not listed are informative only
+HIGHER_IS_BETTER = {
+    "evaluations_per_sec": True,
+    "spots_per_sec": True,
+    "spots_recovered": True,
+    "wall_time": False,
+    "time_to_target": False,
+    "epochs_to_target": False,
+    "peak_memory": False,
+}
+
+# Metrics that vary from one run to the next, the best of the repeated runs is kept
+TIMINGS = ("evaluations_per_sec", "spots_per_sec", "wall_time", "time_to_target")
+
+# Below these values, timings and memory are too noisy to be compared
+NOISE_FLOORS = {"wall_time": 0.01, "time_to_target": 0.01, "peak_memory": 1 << 20}
+
+
+def function_case(name: str, dims: int, num_flies: int, max_iter: int) -> Callable[[], Dict]:
+    """Build the case minimising a standard function until its target fitness is reached."""
+    fitness_func, (low, high), target = FUNCTIONS[name]
+    target = target(dims)
+
+    def case() -> Dict:
+        dfo = DFO(
+            fitness_func=fitness_func,
+            batch_fitness=True,
+            bounds=[(low, high)] * dims,
+            num_flies=num_flies,
+            max_iter=max_iter,
+            fitness_type="min",
+            seed=0,
+        )
+        start = time.perf_counter()
+        evaluations = num_flies
+        epochs_to_target = time_to_target = None
+        for epoch in range(1, max_iter + 1):
+            positions = dfo.ask()
+            dfo.tell(dfo.calculate_population_fitness(positions))
+            evaluations += len(positions)
+            if epochs_to_target is None and dfo.fitness[dfo.best_fly_index] <= target:
+                epochs_to_target, time_to_target = epoch, time.perf_counter() - start
+        wall_time = time.perf_counter() - start
+        return {
+            "evaluations_per_sec": evaluations / wall_time,
+            "wall_time": wall_time,
+            "epochs_to_target": epochs_to_target,
+            "time_to_target": time_to_target,
+            "best_fitness": float(dfo.fitness[dfo.best_fly_index]),
+        }
+
+    return case
+
+
+def matrix_case(
+    resolution: int, num_peaks: int, num_flies: int, engine: str
+) -> Callable[[], Dict]:
+    """Build the case recovering the peaks of a synthetic multi-peak fitness matrix."""
+    matrix, peaks = multi_peak_matrix(resolution, num_peaks)
+    # Two peak widths, see multi_peak_matrix
+    radius = resolution / (4 * np.sqrt(num_peaks))
+
+    def case() -> Dict:
+        dfo = DFO(
+            fitness_matrix=matrix,
+            dims_range=list(matrix.shape),
+            num_flies=num_flies,
+            max_iter=500,
+            stagnation_epochs=30,
+            seed=0,
+        )
+        start = time.perf_counter()
+        spots = dfo.run(
+            max_spots=num_peaks,
+            num_defaults_before_stop=num_peaks,
+            suppression_radius=radius,
+            tabu_radius=radius,
+            engine=engine,
+        )
+        wall_time = time.perf_counter() - start
+        found = np.array([spot["position"] for spot in spots]).reshape(-1, peaks.shape[1])
+        recovered = sum(
+            bool(len(found)) and bool(np.linalg.norm(found - peak, axis=1).min() <= radius)
+            for peak in peaks
+        )
+        return {
+            "spots_recovered": recovered,
+            "spots_per_sec": recovered / wall_time,
+            "wall_time": wall_time,
+        }
+
+    return case
+
+
+def build_cases(quick: bool = False) -> Dict[str, Callable[[], Dict]]:
+    """Build the benchmark cases, by name."""
+    dims_grid = [2, 10] if quick else [2, 10, 30]
+    flies_grid = [50] if quick else [50, 200]
+    resolutions = [256] if quick else [256, 1024, 2048]
+
+    cases = {}
+    for name in FUNCTIONS:
+        for dims in dims_grid:
+            for num_flies in flies_grid:
+                cases[f"{name}-d{dims}-n{num_flies}"] = function_case(
+                    name, dims, num_flies, max_iter=200 if quick else 1000
+                )
+    for resolution in resolutions:
+        for engine in ("swarm", "exact"):
+            cases[f"peaks-{resolution}-{engine}"] = matrix_case(
+                resolution, num_peaks=5, num_flies=100, engine=engine
+            )
+    return cases
+
+
+def measure(case: Callable[[], Dict], repeat: int) -> Dict:
+    """Run a case ``repeat`` times, keeping the best timings, then once more for peak memory."""
+    results = [case() for _ in range(repeat)]
+    metrics = dict(results[0])
+    for name in TIMINGS:
+        values = [result[name] for result in results if result.get(name) is not None]
+        if values:
+            metrics[name] = max(values) if HIGHER_IS_BETTER[name] else min(values)
+
+    # Tracing allocations slows the run down, so memory gets a pass of its own
+    tracemalloc.start()
+    case()
+    metrics["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return metrics
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """List the metrics that regressed by more than ``tolerance`` against the baseline.
+
+    Cases missing from the baseline are listed too, they cannot be checked until it is
+    updated.
+    """
+    regressions = []
+    for case, metrics in results.items():
+        if case not in baseline:
+            regressions.append(f"{case}: missing from the baseline, rerun with --update")
+            continue
+        for name, value in metrics.items():
+            reference = baseline.get(case, {}).get(name)
+            if name not in HIGHER_IS_BETTER or reference is None:
+                continue
+            if value is None:
+                regressions.append(f"{case}: {name} no longer reached (baseline {reference:.4g})")
+                continue
+            floor = NOISE_FLOORS.get(name, 0)
+            if HIGHER_IS_BETTER[name]:
+                regressed = value < reference * (1 - tolerance)
+            else:
+                regressed = max(value, floor) > max(reference, floor) * (1 + tolerance)
+            if regressed:
+                regressions.append(f"{case}: {name} {value:.4g} vs baseline {reference:.4g}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--baseline", default=BASELINE, help="the JSON baseline file")
+    parser.add_argument("--update", action="store_true", help="write the results as the baseline")
+    parser.add_argument("--quick", action="store_true", help="run a smaller grid of cases")
+    parser.add_argument("--repeat", type=int, default=3, help="the runs per case")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="the allowed relative regression"
+    )
+    parser.add_argument("--filter", default="", help="only run the cases containing this text")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Defaults of single searches are expected here and would drown the report
+    logging.getLogger("dfo").setLevel(logging.ERROR)
+
+    results = {}
+    for name, case in build_cases(args.quick).items():
+        if args.filter in name:
+            results[name] = measure(case, args.repeat)
+            logger.info(f"{name}: {json.dumps(results[name])}")
+
+    if args.update or not os.path.exists(args.baseline):
+        baseline = {
+            "environment": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "cpus": os.cpu_count(),
+            },
+            "results": results,
+        }
+        with open(args.baseline, "w") as file:
+            json.dump(baseline, file, indent=2)
+        logger.info(f"Baseline written to {args.baseline}")
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline["results"], args.tolerance)
+    for regression in regressions:
+        logger.error(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    logger.info(f"No regression against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
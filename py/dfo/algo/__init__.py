@@ -9,4 +9,34 @@
 @Project    : Dispersive Flies Optimization (DFO) Algorithm
 """
 
-from .dfo import DFO
\ No newline at end of file
+from .cache import FitnessCache
+from .checkpoint import read_checkpoint, write_checkpoint
+from .dfo import DFO
+from .multi_swarm import MultiSwarmDFO
+from .matrix import (
+    MemmapReference,
+    SharedFitnessMatrix,
+    SparseFitnessMatrix,
+    TiledFitnessMatrix,
+    open_fitness_matrix,
+    picklable_fitness_matrix,
+)
+from .peaks import find_peaks, local_peaks
+from .pyramid import PyramidSearch, build_pyramid, downsample
+from .schedule import (
+    AdaptiveDisturbance,
+    DisturbanceSchedule,
+    ShrinkingPopulation,
+    get_disturbance_schedule,
+    get_population_schedule,
+)
+from .spots import SpotIndex
+from .stats import RunStats
+from .topology import (
+    GlobalTopology,
+    RandomRegularTopology,
+    RingTopology,
+    Topology,
+    VonNeumannTopology,
+    get_topology,
+)
\ No newline at end of file
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""Memoizing fitness cache for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Dict, Hashable, List, MutableMapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FitnessCache:
+    """Bounded LRU cache of fitness values keyed on discrete positions.
+
+    The cache has an in-process LRU layer holding at most ``max_size`` entries. When a
+    ``store`` is given (any mutable mapping, e.g. a ``multiprocessing.Manager().dict()``),
+    local misses are looked up in it and new values are written through to it, so that
+    several workers can share their evaluations. Bounding the shared store is left to
+    its owner.
+    """
+
+    def __init__(self, max_size: int = 100_000, store: MutableMapping = None):
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise ValueError("max_size must be a positive integer")
+
+        self.max_size = max_size
+        self.store = store
+        self.entries: OrderedDict = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries or (self.store is not None and key in self.store)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        """Drop the in-process entries and reset the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default=None):
+        """Get the cached fitness of a position.
+
+        Args:
+            key (Hashable): The position, as a tuple.
+            default (optional): The value returned on a miss. Defaults to None.
+
+        Returns:
+            The cached fitness, or ``default`` when the position was never evaluated.
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+        if self.store is not None:
+            try:
+                value = self.store[key]
+            except KeyError:
+                pass
+            else:
+                self.hits += 1
+                self.__insert(key, value)
+                return value
+
+        self.misses += 1
+        return default
+
+    def get_many(self, keys: List[Hashable]) -> Tuple[List, List[int]]:
+        """Get the cached fitness of several positions.
+
+        Args:
+            keys (list): The positions, as tuples.
+
+        Returns:
+            tuple: The list of cached values (None on a miss) and the indices of the missing keys.
+        """
+        values = [None] * len(keys)
+        missing = []
+        for itr, key in enumerate(keys):
+            value = self.get(key)
+            if value is None:
+                missing.append(itr)
+            else:
+                values[itr] = value
+        return values, missing
+
+    def set(self, key: Hashable, value):
+        """Cache the fitness of a position, evicting the least recently used entry if full.
+
+        Args:
+            key (Hashable): The position, as a tuple.
+            value: The fitness of the position.
+        """
+        self.__insert(key, value)
+        if self.store is not None:
+            self.store[key] = value
+
+    def set_many(self, items: Dict[Hashable, float]):
+        """Cache the fitness of several positions.
+
+        Args:
+            items (dict): Mapping of positions to their fitness.
+        """
+        for key, value in items.items():
+            self.__insert(key, value)
+        if self.store is not None:
+            self.store.update(items)
+
+    def stats(self) -> Dict:
+        """Get the cache counters.
+
+        Returns:
+            dict: The size, hits, misses, evictions and hit rate of the cache.
+        """
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+    def __insert(self, key: Hashable, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
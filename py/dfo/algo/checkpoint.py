@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""Binary checkpoints of the Dispersive Fly Optimization (DFO) swarm state.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import io
+import json
+import logging
+import os
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the checkpoint changes
+CHECKPOINT_VERSION = 1
+
+
+def encode_rng_state(rng: np.random.Generator) -> np.ndarray:
+    """Encode the state of a random stream as a string array, so it is stored without pickle."""
+    return np.array(json.dumps(rng.bit_generator.state))
+
+
+def decode_rng_state(rng: np.random.Generator, state: np.ndarray):
+    """Restore the state of a random stream encoded by encode_rng_state.
+
+    Raises:
+        ValueError: If the checkpoint was written by a different bit generator.
+    """
+    state = json.loads(state.item())
+    if state["bit_generator"] != type(rng.bit_generator).__name__:
+        raise ValueError(
+            f"The checkpoint holds a {state['bit_generator']} random stream, "
+            f"not a {type(rng.bit_generator).__name__}"
+        )
+    rng.bit_generator.state = state
+
+
+def write_checkpoint(state: Dict[str, np.ndarray], target=None) -> bytes | None:
+    """Write a checkpoint as a compressed ``.npz`` archive.
+
+    Files are written to a temporary file first and then renamed, so an interrupted write
+    never replaces the last good checkpoint.
+
+    Args:
+        state (dict): The arrays of the checkpoint, by name.
+        target (str or os.PathLike, optional): The checkpoint file. Defaults to None.
+
+    Returns:
+        bytes or None: The content of the checkpoint if no target is given, None otherwise.
+    """
+    state = dict(state, version=np.array(CHECKPOINT_VERSION))
+    if target is None:
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **state)
+        return buffer.getvalue()
+
+    path = os.fspath(target)
+    partial = f"{path}.partial"
+    with open(partial, "wb") as file:
+        np.savez_compressed(file, **state)
+    os.replace(partial, path)
+    logger.debug(f"Checkpoint written to {path}")
+    return None
+
+
+def read_checkpoint(source) -> Dict[str, np.ndarray]:
+    """Read a checkpoint written by write_checkpoint.
+
+    Args:
+        source (bytes, str or os.PathLike): The content of the checkpoint or its file.
+
+    Returns:
+        dict: The arrays of the checkpoint, by name.
+
+    Raises:
+        ValueError: If the checkpoint has an unsupported version.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    with np.load(source, allow_pickle=False) as archive:
+        state = {name: archive[name] for name in archive.files}
+
+    version = int(state.pop("version", -1))
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version}")
+    return state
@@ -14,35 +14,190 @@
 @Project    : Dispersive Flies Optimization (DFO) Algorithm
 """
 
+import asyncio
+import inspect
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from typing import Dict, List, Tuple
 import numpy as np
+
+from .cache import FitnessCache
+from .checkpoint import decode_rng_state, encode_rng_state, read_checkpoint, write_checkpoint
+from .multi_swarm import MultiSwarmDFO
+from .peaks import EXACT_MAX_CELLS, find_peaks
+from .pyramid import PyramidSearch
+from .schedule import (
+    DisturbanceSchedule,
+    ShrinkingPopulation,
+    get_disturbance_schedule,
+    get_population_schedule,
+)
+from .spots import SpotIndex
+from .stats import RunStats
+from .matrix import open_fitness_matrix, picklable_fitness_matrix
+from .topology import Topology, get_topology
 # from dfo.core.logger import logger
 
 logger = logging.getLogger(__name__)
 
+# Populations between two serial reference chunks of the fitness thread pool
+THREAD_CALIBRATION_EVERY = 16
+
+
+def _narrowest_uint(max_value: int) -> np.dtype:
+    """Get the narrowest unsigned dtype up to uint32 holding ``max_value``, int64 beyond."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+# Keyword arguments of the DFO, sent once to every worker process of independent restarts
+_worker_params: Dict = None
+
+
+def _init_worker(params: Dict):
+    """Keep the keyword arguments of the DFO in a worker process, for all of its restarts.
+
+    Args:
+        params (dict): The keyword arguments the DFO was built with.
+    """
+    global _worker_params
+    _worker_params = params
+
+
+def _run_restart(
+    rng: np.random.Generator, tabu_centers: np.ndarray, tabu_radius: float
+) -> Tuple[Dict, bool, RunStats]:
+    """Run one independent swarm in a worker process.
+
+    Args:
+        rng (numpy.random.Generator): The worker's own random number stream.
+        tabu_centers (numpy.ndarray): The centers of the tabu regions.
+        tabu_radius (float): The radius of the tabu regions.
+
+    Returns:
+        tuple: The best fly of the swarm, whether the swarm converged and the statistics of
+        the worker, if collected.
+    """
+    # The tabu regions are set before the flies are first scored
+    dfo = DFO(**dict(_worker_params, seed=rng, tabu_regions=(tabu_centers, tabu_radius)))
+    return (*dfo.search(), dfo.stats)
+
+
 class DFO:
     def __init__(
         self,
         *,
         fitness_func=None,
-        fitness_matrix: np.ndarray = None,
+        fitness_matrix=None,
         dims_range: List | Tuple = None,
         num_flies: int = 100,
         max_iter: int = 1000,
         fitness_type: str = "max",  # min or max
+        batch_fitness: bool = False,
+        cache: FitnessCache = None,
+        convergence_tol: float = 0,
+        stagnation_epochs: int = None,
+        stagnation_tol: float = 0,
+        topology: str | Topology = "ring",
+        bounds: List[Tuple[float, float]] = None,
+        boundary: str = "clip",  # clip, reflect or wrap
+        seed: int | np.random.Generator = None,
+        external_fitness: bool = False,
+        threads: int = 1,
+        chunk_size: int = 64,
+        stats: bool | RunStats = False,
+        position_dtype=None,
+        fitness_dtype="float64",
+        disturbance: str | float | DisturbanceSchedule = "fixed",
+        population: str | ShrinkingPopulation = None,
+        tabu_regions: Tuple[np.ndarray, float] = None,
     ):
+        # Keep the arguments, independent restarts rebuild the swarm from them in worker processes
+        self.params = {name: value for name, value in locals().items() if name != "self"}
         self.__validate_params(
-            fitness_func, fitness_matrix, dims_range, num_flies, max_iter, fitness_type
+            fitness_func,
+            fitness_matrix,
+            dims_range,
+            num_flies,
+            max_iter,
+            fitness_type,
+            batch_fitness,
+            cache,
+            convergence_tol,
+            stagnation_epochs,
+            stagnation_tol,
+            topology,
+            bounds,
+            boundary,
+            seed,
+            external_fitness,
+            threads,
+            chunk_size,
+            stats,
+            position_dtype,
+            fitness_dtype,
+            disturbance,
+            population,
+            tabu_regions,
         )
         self.__init__dfo()
 
     def __init__dfo(self):
-        """Initialize the DFO algorithm with the given parameters."""
+        """Initialize the DFO algorithm with the given parameters.
 
-        self.flies: List[Dict] = self.init_flies()
-        self.best_fly_index = self.get_best_fly_index()
-        self.find_best_neighbour()
+        The swarm is held as a ``(num_flies, dims)`` array of positions with a parallel
+        fitness vector, so every epoch runs as whole-array operations. The historical
+        list-of-dicts representation is still available through :attr:`flies`.
+        """
+
+        # Inclusive bounds of the search space, an integer lattice unless in continuous mode.
+        # Bounds keep the wide dtype, the arithmetic of the dispersal is done in it
+        self.lower_bounds = np.array([low for low, _ in self.bounds], dtype=self.work_dtype)
+        self.upper_bounds = np.array([high for _, high in self.bounds], dtype=self.work_dtype)
+        self.positions: np.ndarray = np.zeros(
+            (self.num_flies, len(self.dims_range)), dtype=self.position_dtype
+        )
+        self.fitness: np.ndarray = np.zeros(self.num_flies, dtype=self.fitness_dtype)
+        self.best_neighbours: np.ndarray = np.zeros(self.num_flies, dtype=self.neighbour_dtype)
+
+        # Convergence state, the spread is only recomputed after the flies have moved
+        self.spread: np.ndarray = np.zeros(len(self.dims_range))
+        self.stagnant_epochs = 0
+        self.search_epoch = 0
+        self.__best_fitness = np.inf if self.fitness_type == "min" else -np.inf
+        self.__spread_is_stale = True
+
+        # Basins of the spots already found, scored with the worst fitness so flies avoid them
+        self.tabu_centers: np.ndarray = np.empty((0, len(self.dims_range)))
+        self.tabu_radius = 0
+        if self.__initial_tabu_regions is not None:
+            self.set_tabu_regions(*self.__initial_tabu_regions)
+        self.worst_fitness = np.inf if self.fitness_type == "min" else -np.inf
+
+        # Scheduled disturbance threshold, and flies retired since the last restart
+        self.cut_off = self.disturbance.cut_off
+        self.retired_flies = 0
+
+        # Positions handed out by ask() and waiting for their fitness in tell()
+        self.__pending: Tuple[np.ndarray, np.ndarray] = None
+        self.best_fly_index = 0
+        self.epoch = 0
+
+        # Periodic checkpoints of a run, and whether a loaded checkpoint can resume one
+        self.__checkpoint = None
+        self.__checkpoint_every = None
+        self.__resumable = False
+
+        # Tiled matrices load the tiles around the swarm ahead of its next lookups
+        self.__prefetch = getattr(self.fitness_matrix, "prefetch", None)
+
+        if self.stats is not None:
+            self.stats.instrument(self)
+        self.restart()
 
     def __validate_params(
         self,
@@ -52,28 +207,112 @@ class DFO:
         num_flies,
         max_iter,
         fitness_type,
+        batch_fitness,
+        cache,
+        convergence_tol,
+        stagnation_epochs,
+        stagnation_tol,
+        topology,
+        bounds,
+        boundary,
+        seed,
+        external_fitness,
+        threads,
+        chunk_size,
+        stats,
+        position_dtype,
+        fitness_dtype,
+        disturbance,
+        population,
+        tabu_regions,
     ):
         """Validate the input parameters for the algorithm
 
         Args:
             fitness_func (callable): The fitness function to be optimized.
-            fitness_matrix (numpy.ndarray): The matrix of fitness values for each fly.
+            fitness_matrix (numpy.ndarray, str, SharedFitnessMatrix, SparseFitnessMatrix or
+                TiledFitnessMatrix): The matrix of fitness values for each fly. A path to a
+                ``.npy`` file is memory-mapped read-only, a path to a tile directory is opened
+                as a TiledFitnessMatrix, and SciPy or pydata sparse matrices are wrapped in a
+                SparseFitnessMatrix.
             dims_range (list or tuple): The range of each dimension in the search space.
             num_flies (int): The number of flies in the population.
             max_iter (int): The maximum number of iterations for the algorithm.
+            fitness_type (str): Either 'min' or 'max'.
+            batch_fitness (bool): Whether fitness_func takes a ``(N, dims)`` array of positions
+                and returns the N fitness values at once.
+            cache (FitnessCache): Optional cache of fitness values keyed on positions.
+            convergence_tol (float): The swarm has converged once the spread of every dimension
+                is at most this value.
+            stagnation_epochs (int): Optionally, the swarm has also converged once the best
+                fitness has not improved for this many epochs.
+            stagnation_tol (float): Improvements of the best fitness up to this value still count
+                as stagnation, which matters for real-valued fitness.
+            topology (str or Topology): The neighbourhood topology, one of 'ring', 'von_neumann',
+                'random' and 'global', or a Topology instance.
+            bounds (list of tuples): The ``(low, high)`` bounds of each dimension. When given, the
+                search space is continuous and positions are real-valued.
+            boundary (str): How flies leaving the search space are brought back, one of 'clip',
+                'reflect' and 'wrap'.
+            seed (int or numpy.random.Generator): The seed of the random number stream, or the
+                stream itself.
+            external_fitness (bool): Whether the fitness is evaluated outside of the DFO, through
+                ask() and tell(), in which case neither fitness_func nor fitness_matrix is needed.
+            threads (int): The number of threads evaluating fitness_func on a population, None
+                for one per CPU. Worth it for fitness functions that release the GIL.
+            chunk_size (int): The number of positions per thread pool task. Smaller populations
+                are evaluated in the calling thread.
+            stats (bool or RunStats): Whether to collect run statistics and phase timings in a
+                RunStats, or the RunStats to collect them in, e.g. the one of a parent swarm.
+                When off, the hot path is not instrumented at all.
+            position_dtype (str or numpy.dtype): The dtype the positions are stored in. None
+                keeps int64 (float64 in continuous mode), 'compact' picks the narrowest one
+                holding the search space (uint8 to uint32, float32 in continuous mode) and also
+                narrows the best neighbour indexes. Batch fitness functions still receive
+                int64 (float64) arrays.
+            fitness_dtype (str or numpy.dtype): The dtype the fitness of the swarm is stored in,
+                either 'float64' or 'float32'. Fitness is still computed in float64.
+            disturbance (str, float or DisturbanceSchedule): The disturbance threshold of the
+                epochs run by search() and ask() without an explicit cut_off: 'fixed' (0.002),
+                a fixed threshold, 'adaptive' or a DisturbanceSchedule instance.
+            population (str or ShrinkingPopulation): Optionally, 'shrink' or a
+                ShrinkingPopulation instance retiring redundant flies once the swarm is tight.
+            tabu_regions (tuple): Optionally, the ``(centers, radius)`` of tabu regions masked
+                from the first population on, as set by set_tabu_regions().
 
         Raises:
             ValueError: If any of the input parameters are invalid.
         """
+        fitness_matrix = open_fitness_matrix(fitness_matrix)
+        if not isinstance(external_fitness, bool):
+            raise ValueError("external_fitness must be a boolean")
+        elif external_fitness and (fitness_func is not None or fitness_matrix is not None):
+            raise ValueError("external_fitness excludes fitness_func and fitness_matrix")
+        else:
+            self.external_fitness = external_fitness
+
+        # Coroutine fitness functions can only be awaited by the asynchronous runs
+        self.async_fitness = inspect.iscoroutinefunction(fitness_func)
+
         if fitness_func is None and (
             fitness_matrix is None or len(fitness_matrix) == 0
-        ):
+        ) and not external_fitness:
             raise ValueError("Either fitness_func or fitness_matrix must be provided")
         else:
             self.fitness_func = fitness_func
             self.fitness_matrix = fitness_matrix
 
-        if not isinstance(dims_range, (list, tuple)):
+        if bounds is not None:
+            if fitness_func is None and not external_fitness:
+                raise ValueError("bounds require a fitness_func")
+            if not isinstance(bounds, (list, tuple)) or not all(
+                len(bound) == 2 and bound[0] < bound[1] for bound in bounds
+            ):
+                raise ValueError("bounds must be a list of (low, high) pairs with low < high")
+            self.continuous = True
+            self.bounds = [tuple(bound) for bound in bounds]
+            self.dims_range = self.bounds
+        elif not isinstance(dims_range, (list, tuple)):
             # If the fitness matrix is provided, the dimensions range is inferred from the matrix
             if fitness_matrix is not None:
                 self.dims_range = fitness_matrix.shape
@@ -84,6 +323,10 @@ class DFO:
                 raise ValueError("dims_range must be a list of lists")
         else:
             self.dims_range = dims_range
+
+        if bounds is None:
+            self.continuous = False
+            self.bounds = [(0, extent - 1) for extent in self.dims_range]
             
         if not isinstance(num_flies, int):
             raise ValueError("num_flies must be an integer")
@@ -100,6 +343,182 @@ class DFO:
         else:
             self.fitness_type = fitness_type.lower()
 
+        if not isinstance(batch_fitness, bool):
+            raise ValueError("batch_fitness must be a boolean")
+        elif batch_fitness and fitness_func is None:
+            raise ValueError("batch_fitness requires a fitness_func")
+        else:
+            self.batch_fitness = batch_fitness
+
+        if cache is not None and not isinstance(cache, FitnessCache):
+            raise ValueError("cache must be a FitnessCache")
+        else:
+            self.cache = cache
+
+        if not isinstance(convergence_tol, (int, float)) or convergence_tol < 0:
+            raise ValueError("convergence_tol must be a non-negative number")
+        else:
+            self.convergence_tol = convergence_tol
+
+        if stagnation_epochs is not None and (
+            not isinstance(stagnation_epochs, int) or stagnation_epochs <= 0
+        ):
+            raise ValueError("stagnation_epochs must be a positive integer")
+        else:
+            self.stagnation_epochs = stagnation_epochs
+
+        if not isinstance(stagnation_tol, (int, float)) or stagnation_tol < 0:
+            raise ValueError("stagnation_tol must be a non-negative number")
+        else:
+            self.stagnation_tol = stagnation_tol
+
+        if self.continuous and convergence_tol == 0 and stagnation_epochs is None:
+            logger.warning(
+                "Real-valued flies rarely share the exact same position, set convergence_tol "
+                "or stagnation_epochs to detect convergence in continuous mode"
+            )
+
+        try:
+            self.rng = np.random.default_rng(seed)
+        except (TypeError, ValueError):
+            raise ValueError("seed must be an integer or a numpy.random.Generator")
+
+        self.topology = get_topology(topology, seed=self.rng)
+
+        if boundary not in ["clip", "reflect", "wrap"]:
+            raise ValueError("boundary must be one of 'clip', 'reflect' and 'wrap'")
+        else:
+            self.boundary = boundary
+
+        if threads is None:
+            threads = os.cpu_count() or 1
+        if not isinstance(threads, int) or threads <= 0:
+            raise ValueError("threads must be a positive integer or None")
+        else:
+            self.threads = threads
+
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive integer")
+        else:
+            self.chunk_size = chunk_size
+
+        # The thread pool is only started by the first population that is worth splitting
+        self.__executor = None
+        # The speedup is measured against chunks regularly evaluated on the calling thread alone
+        self.thread_stats = {
+            "calls": 0,
+            "wall_time": 0.0,
+            "positions": 0,
+            "serial_time": 0.0,
+            "serial_positions": 0,
+        }
+
+        if not isinstance(stats, (bool, RunStats)):
+            raise ValueError("stats must be a boolean or a RunStats")
+        elif isinstance(stats, RunStats):
+            self.stats: RunStats = stats
+        else:
+            self.stats: RunStats = RunStats() if stats else None
+
+        # Positions are stored in position_dtype and computed in the wide work_dtype
+        self.work_dtype = np.float64 if self.continuous else np.int64
+        self.neighbour_dtype = np.dtype(np.int64)
+        if position_dtype is None:
+            self.position_dtype = np.dtype(self.work_dtype)
+        elif isinstance(position_dtype, str) and position_dtype == "compact":
+            self.position_dtype = self.__compact_position_dtype()
+            self.neighbour_dtype = _narrowest_uint(max(self.num_flies - 1, 0))
+        else:
+            try:
+                self.position_dtype = np.dtype(position_dtype)
+            except TypeError:
+                raise ValueError("position_dtype must be None, 'compact' or a numpy dtype")
+            kind = "f" if self.continuous else "iu"
+            if self.position_dtype.kind not in kind or (
+                not self.continuous
+                and np.iinfo(self.position_dtype).max < max(high for _, high in self.bounds)
+            ):
+                raise ValueError(
+                    f"position_dtype {self.position_dtype} cannot hold the positions of the "
+                    f"search space"
+                )
+
+        try:
+            self.fitness_dtype = np.dtype(fitness_dtype)
+        except TypeError:
+            raise ValueError("fitness_dtype must be either 'float64' or 'float32'")
+        if self.fitness_dtype not in (np.float64, np.float32):
+            raise ValueError("fitness_dtype must be either 'float64' or 'float32'")
+
+        self.disturbance = get_disturbance_schedule(disturbance)
+        self.population = get_population_schedule(population)
+
+        if tabu_regions is not None and (
+            not isinstance(tabu_regions, tuple) or len(tabu_regions) != 2
+        ):
+            raise ValueError("tabu_regions must be None or a (centers, radius) tuple")
+        else:
+            self.__initial_tabu_regions = tabu_regions
+
+    def __compact_position_dtype(self) -> np.dtype:
+        """Get the narrowest dtype that holds every position of the search space."""
+        if self.continuous:
+            return np.dtype(np.float32)
+        return _narrowest_uint(max(high for _, high in self.bounds))
+
+    def ask(self, cut_off: float = None) -> np.ndarray:
+        """Get the candidate positions to be evaluated for the next epoch.
+
+        These are the dispersed positions of every fly but the best one or, for an
+        ``external_fitness`` swarm that was just (re-)initialised, the whole population.
+        Asking again before ``tell()`` returns the same candidates.
+
+        Args:
+            cut_off (float, optional): The disturbance threshold. Defaults to None, the
+                scheduled ``cut_off``.
+
+        Returns:
+            numpy.ndarray: A ``(N, dims)`` array of positions.
+        """
+        if cut_off is None:
+            cut_off = self.cut_off
+        if self.__pending is None:
+            moving = np.arange(self.num_flies) != self.best_fly_index
+            new_positions = self.dispersed_positions(
+                self.positions[moving],
+                self.positions[self.best_neighbours[moving]],
+                self.positions[self.best_fly_index],
+                cut_off,
+            )
+            self.__pending = (moving, new_positions)
+        return self.__pending[1]
+
+    def apply_boundary(self, positions: np.ndarray) -> np.ndarray:
+        """Bring positions that left the search space back within its bounds.
+
+        Depending on ``boundary``, out-of-range coordinates are clipped to the nearest bound,
+        reflected back off the bound they crossed, or wrapped around to the opposite bound.
+
+        Args:
+            positions (numpy.ndarray): A ``(N, dims)`` array of positions.
+
+        Returns:
+            numpy.ndarray: The positions within the bounds.
+        """
+        if self.boundary == "clip":
+            return np.clip(positions, self.lower_bounds, self.upper_bounds)
+
+        # On the integer lattice both bounds are inclusive, so the period is one step longer
+        width = self.upper_bounds - self.lower_bounds
+        offsets = positions - self.lower_bounds
+        if self.boundary == "wrap":
+            period = width if self.continuous else width + 1
+            return self.lower_bounds + np.mod(offsets, period)
+
+        period = np.maximum(2 * width, 1)
+        offsets = np.mod(offsets, period)
+        return self.lower_bounds + np.where(offsets > width, period - offsets, offsets)
+
     def calculate_fitness(self, pos: List | Tuple = None):
         """Calculate the fitness of a position in the search space.
 
@@ -117,40 +536,388 @@ class DFO:
         if not pos or len(pos) == 0:
             raise ValueError("Position must be provided")
 
+        if len(self.tabu_centers) and self.in_tabu_region(np.asarray([pos]))[0]:
+            return self.worst_fitness
+
+        if self.cache is None:
+            return self.__evaluate_fitness(pos)
+
+        key = tuple(pos)
+        fitness = self.cache.get(key)
+        if fitness is None:
+            fitness = self.__evaluate_fitness(pos)
+            self.cache.set(key, fitness)
+        return fitness
+
+    def __evaluate_fitness(self, pos: List | Tuple):
+        """Evaluate the fitness of a single position, bypassing the cache."""
+        if self.external_fitness:
+            raise ValueError("The fitness is evaluated externally, use ask() and tell()")
+        if self.async_fitness:
+            raise ValueError("fitness_func is a coroutine function, use run_async()")
+
+        # Batches count their evaluations themselves
+        if self.fitness_func is not None and self.batch_fitness:
+            return self.__evaluate_population(np.asarray([pos]))[0]
+        if self.stats is not None:
+            self.stats.evaluations += 1
+        return self.__call_fitness(pos)
+
+    def __call_fitness(self, pos: List | Tuple):
+        """Call fitness_func on a single position, or look it up in the fitness matrix."""
+        if self.fitness_func is None:
+            return self.__matrix_fitness(pos)
+
         fitness = None
 
         try:
             fitness = self.fitness_func(pos)
         except:
-            # Calculate fitness using fitness matrix where position is in the N dimensional space and fitness is the value at that position
-            if len(pos) != len(self.dims_range):
+            fitness = self.__matrix_fitness(pos)
+        finally:
+            return fitness
+
+    def __matrix_fitness(self, pos: List | Tuple):
+        """Look up the fitness of a position in the fitness matrix.
+
+        Args:
+            pos (List or Tuple): The position in the search space.
+
+        Returns:
+            float: The value of the fitness matrix at the given position.
+
+        Raises:
+            ValueError: If the position is not of the same dimension as the problem.
+        """
+        # Position is in the N dimensional space and fitness is the value at that position
+        if len(pos) != len(self.dims_range):
+            raise ValueError("Position must be of the same dimension as the problem")
+        return self.fitness_matrix[tuple(pos)]
+
+    def calculate_population_fitness(self, positions: np.ndarray) -> np.ndarray:
+        """Calculate the fitness of every row of a ``(N, dims)`` array of positions.
+
+        With ``batch_fitness`` the whole array is handed to ``fitness_func`` in one call, and
+        a ``fitness_matrix`` problem is scored with a single fancy-index gather. Otherwise
+        ``fitness_func`` is called once per position. Positions within a tabu region get the
+        worst fitness without being evaluated.
+
+        Args:
+            positions (numpy.ndarray): The positions to be evaluated, one per row.
+
+        Returns:
+            numpy.ndarray: A vector holding the N fitness values.
+
+        Raises:
+            ValueError: If a batched fitness_func does not return one value per position.
+        """
+        if len(self.tabu_centers):
+            in_tabu = self.in_tabu_region(positions)
+            if in_tabu.any():
+                fitness = np.full(len(positions), self.worst_fitness)
+                if not in_tabu.all():
+                    fitness[~in_tabu] = self.__cached_population_fitness(positions[~in_tabu])
+                return fitness
+        return self.__cached_population_fitness(positions)
+
+    def __cached_population_fitness(self, positions: np.ndarray) -> np.ndarray:
+        """Calculate the fitness of an array of positions through the cache, if any."""
+        if self.cache is None:
+            return self.__evaluate_population(positions)
+
+        values, keys, pending = self.__lookup_cache(positions)
+        if pending:
+            fitness = self.__evaluate_population(positions[list(pending.values())])
+            self.__store_cache(values, keys, pending, fitness)
+        return np.asarray(values, dtype=np.float64)
+
+    def __lookup_cache(self, positions: np.ndarray) -> Tuple[List, List, Dict]:
+        """Look up positions in the cache.
+
+        Returns:
+            tuple: The cached values (None on a miss), the position keys, and the distinct
+            missing keys mapped to the row of their first occurrence.
+        """
+        keys = list(map(tuple, positions.tolist()))
+        values, missing = self.cache.get_many(keys)
+        pending = {}
+        for itr in missing:
+            pending.setdefault(keys[itr], itr)
+        return values, keys, pending
+
+    def __store_cache(self, values: List, keys: List, pending: Dict, fitness: np.ndarray):
+        """Cache the fitness of the pending keys and fill in the missing values."""
+        computed = dict(zip(pending.keys(), fitness.tolist()))
+        self.cache.set_many(computed)
+        for itr, key in enumerate(keys):
+            if values[itr] is None:
+                values[itr] = computed[key]
+
+    async def calculate_population_fitness_async(
+        self, positions: np.ndarray, concurrency: int = 10
+    ) -> np.ndarray:
+        """Calculate the fitness of every row of a ``(N, dims)`` array of positions, asynchronously.
+
+        A coroutine ``fitness_func`` is awaited for all the positions concurrently, with at most
+        ``concurrency`` calls in flight (or awaited once with the whole array in
+        ``batch_fitness`` mode). Any other fitness is calculated in a worker thread, so that the
+        event loop is never blocked. Tabu regions and the cache apply as in
+        calculate_population_fitness.
+
+        Args:
+            positions (numpy.ndarray): The positions to be evaluated, one per row.
+            concurrency (int, optional): The maximum number of concurrent fitness calls.
+                Defaults to 10.
+
+        Returns:
+            numpy.ndarray: A vector holding the N fitness values.
+        """
+        if not self.async_fitness:
+            return await asyncio.to_thread(self.calculate_population_fitness, positions)
+
+        fitness = np.full(len(positions), self.worst_fitness)
+        if len(self.tabu_centers):
+            rows = np.flatnonzero(~self.in_tabu_region(positions))
+        else:
+            rows = np.arange(len(positions))
+        if not len(rows):
+            return fitness
+
+        if self.cache is None:
+            fitness[rows] = await self.__evaluate_population_async(positions[rows], concurrency)
+            return fitness
+
+        values, keys, pending = self.__lookup_cache(positions[rows])
+        if pending:
+            evaluated = await self.__evaluate_population_async(
+                positions[rows][list(pending.values())], concurrency
+            )
+            self.__store_cache(values, keys, pending, evaluated)
+        fitness[rows] = values
+        return fitness
+
+    async def __evaluate_population_async(
+        self, positions: np.ndarray, concurrency: int
+    ) -> np.ndarray:
+        """Await a coroutine fitness_func for an array of positions, bypassing the cache."""
+        if self.stats is not None:
+            self.stats.evaluations += len(positions)
+        if self.batch_fitness:
+            fitness = await self.fitness_func(positions.astype(self.work_dtype, copy=False))
+            fitness = np.asarray(fitness, dtype=np.float64).reshape(-1)
+            if len(fitness) != len(positions):
                 raise ValueError(
-                    "Position must be of the same dimension as the problem"
+                    f"fitness_func returned {len(fitness)} values for {len(positions)} positions"
                 )
-            fitness = self.fitness_matrix[tuple(pos)]
-        finally:
             return fitness
 
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def evaluate(pos: Tuple):
+            async with semaphore:
+                return await self.fitness_func(pos)
+
+        fitness = await asyncio.gather(
+            *(evaluate(tuple(pos)) for pos in positions.tolist())
+        )
+        return np.asarray(fitness, dtype=np.float64)
+
+    def __evaluate_population(self, positions: np.ndarray) -> np.ndarray:
+        """Evaluate the fitness of a ``(N, dims)`` array of positions, bypassing the cache.
+
+        With ``threads`` > 1, populations larger than ``chunk_size`` are split into chunks that
+        are evaluated concurrently by a thread pool.
+        """
+        if self.external_fitness:
+            raise ValueError("The fitness is evaluated externally, use ask() and tell()")
+        if self.async_fitness:
+            raise ValueError("fitness_func is a coroutine function, use run_async()")
+        if self.stats is not None:
+            self.stats.evaluations += len(positions)
+
+        if self.fitness_func is None:
+            return np.asarray(
+                self.fitness_matrix[tuple(positions.T)], dtype=np.float64
+            )
+
+        if self.threads > 1 and len(positions) > self.chunk_size:
+            return self.__evaluate_threaded(positions)
+        return self.__evaluate_chunk(positions)
+
+    def __evaluate_chunk(self, positions: np.ndarray) -> np.ndarray:
+        """Evaluate the fitness function on an array of positions in the calling thread."""
+        if self.batch_fitness:
+            # Compact positions would wrap around in the arithmetic of the fitness function
+            fitness = self.fitness_func(positions.astype(self.work_dtype, copy=False))
+            fitness = np.asarray(fitness, dtype=np.float64).reshape(-1)
+            if len(fitness) != len(positions):
+                raise ValueError(
+                    f"fitness_func returned {len(fitness)} values for {len(positions)} positions"
+                )
+            return fitness
+
+        fitness = np.empty(len(positions), dtype=np.float64)
+        for itr, pos in enumerate(positions):
+            fitness[itr] = self.__call_fitness(tuple(pos.tolist()))
+        return fitness
+
+    def __evaluate_threaded(self, positions: np.ndarray) -> np.ndarray:
+        """Evaluate the chunks of a population in the thread pool and record the speedup.
+
+        Every ``THREAD_CALIBRATION_EVERY`` populations, starting with the first one, the first
+        chunk is evaluated on the calling thread alone before the others are handed to the
+        pool, as the serial reference of the speedup.
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.threads, thread_name_prefix="dfo-fitness"
+            )
+
+        chunks = np.array_split(positions, -(-len(positions) // self.chunk_size))
+        results = []
+        if self.thread_stats["calls"] % THREAD_CALIBRATION_EVERY == 0:
+            start = time.perf_counter()
+            results.append(self.__evaluate_chunk(chunks[0]))
+            self.thread_stats["serial_time"] += time.perf_counter() - start
+            self.thread_stats["serial_positions"] += len(chunks[0])
+            chunks = chunks[1:]
+
+        start = time.perf_counter()
+        results.extend(self.__executor.map(self.__evaluate_chunk, chunks))
+        self.thread_stats["calls"] += 1
+        self.thread_stats["wall_time"] += time.perf_counter() - start
+        self.thread_stats["positions"] += sum(len(chunk) for chunk in chunks)
+        return np.concatenate(results)
+
     def check_convergence(self):
-        """Check if flies have converged to the same position."""
-        return len(set([fly["position"] for fly in self.flies])) == 1
+        """Check if the flies have converged.
 
-    def disperse_flies(self, cut_off: float = 0.002):
-        for itr, val in enumerate(self.flies):
-            if itr != self.best_fly_index:
-                self.update_fly(itr, cut_off)
+        The swarm has converged when the spread (max - min) of every dimension is within
+        ``convergence_tol`` (by default, all flies share the same position), or when the best
+        fitness has been stagnant for ``stagnation_epochs`` epochs. The spread is cached
+        between moves, so checking repeatedly within an epoch is cheap.
+
+        Returns:
+            bool: True if the swarm has converged.
+        """
+        if self.stagnation_epochs is not None and self.stagnant_epochs >= self.stagnation_epochs:
+            return True
+        return bool(self.get_spread().max() <= self.convergence_tol)
+
+    def close(self):
+        """Shut down the fitness thread pool, if it was started.
+
+        run() and run_async() do so when they return. A DFO is also a context manager
+        closing itself on exit, e.g. around direct calls to search().
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __enter__(self) -> "DFO":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def disperse_flies(self, cut_off: float = None):
+        """Move every fly but the best one and re-evaluate their fitness.
+
+        All flies are updated at once from the positions of the previous epoch: each
+        coordinate either restarts at random (with probability ``cut_off``) or moves
+        towards the best neighbour as ``neighbour + U(0, 1) * (best - position)``.
+
+        Args:
+            cut_off (float, optional): The disturbance threshold. Defaults to None, the
+                scheduled ``cut_off``.
+        """
+        new_positions = self.ask(cut_off)
+        moving, _ = self.__pending
+        self.__pending = None
+        self.__move_flies(moving, new_positions, self.calculate_population_fitness(new_positions))
+
+    def __move_flies(self, moving: np.ndarray, positions: np.ndarray, fitness: np.ndarray):
+        """Set the positions and fitness of the flies selected by the ``moving`` mask."""
+        self.positions[moving] = positions
+        self.fitness[moving] = fitness
+        self.__spread_is_stale = True
+
+    def dispersed_positions(
+        self,
+        positions: np.ndarray,
+        neighbour_positions: np.ndarray,
+        best_positions: np.ndarray,
+        cut_off: float,
+    ) -> np.ndarray:
+        """Compute the dispersed positions for a block of flies.
+
+        The random numbers of the whole block are drawn at once from the DFO random stream.
+
+        Args:
+            positions (numpy.ndarray): The current positions of the flies to be moved.
+            neighbour_positions (numpy.ndarray): The positions of their best neighbours.
+            best_positions (numpy.ndarray): The position of the best fly, broadcast against
+                the positions.
+            cut_off (float): The disturbance threshold.
+
+        Returns:
+            numpy.ndarray: The new positions, within the bounds of the search space.
+        """
+        steps, disturbance = self.rng.random((2, *positions.shape))
+        # Subtract in the wide dtype, compact unsigned positions would wrap around
+        offsets = np.subtract(best_positions, positions, dtype=self.work_dtype)
+        new_positions = neighbour_positions + steps * offsets
+        if not self.continuous:
+            new_positions = np.trunc(new_positions).astype(np.int64)
+        new_positions = self.apply_boundary(new_positions)
+
+        disturbed = np.nonzero(disturbance < cut_off)
+        if len(disturbed[0]):
+            # Only draw the coordinates that restart, each within its own dimension bounds
+            dims = disturbed[-1]
+            if self.continuous:
+                new_positions[disturbed] = self.rng.uniform(
+                    self.lower_bounds[dims], self.upper_bounds[dims]
+                )
+            else:
+                new_positions[disturbed] = self.rng.integers(
+                    self.lower_bounds[dims], self.upper_bounds[dims], endpoint=True
+                )
+        return new_positions.astype(self.position_dtype, copy=False)
 
     def find_best_neighbour(self):
         """Get the best neighbour fly for each fly in the population."""
-        for itr in range(len(self.flies)):
-            self.flies[itr]["best_neighbour"] = self.get_best_neighbour_fly_index(itr)
+        self.best_neighbours = self.topology.best_neighbours(
+            self.fitness, self.fitness_type
+        ).astype(self.neighbour_dtype, copy=False)
+
+    @property
+    def flies(self) -> List[Dict]:
+        """The population as a list of dictionaries (a view built from the swarm arrays).
+
+        Returns:
+            list: One dictionary per fly with its ``position``, ``fitness`` and ``best_neighbour``.
+        """
+        return [self.get_fly(itr) for itr in range(self.num_flies)]
+
+    @flies.setter
+    def flies(self, flies: List[Dict]):
+        self.num_flies = len(flies)
+        self.positions = np.array(
+            [fly["position"] for fly in flies], dtype=self.position_dtype
+        )
+        self.fitness = np.array([fly["fitness"] for fly in flies], dtype=self.fitness_dtype)
+        self.best_neighbours = np.array(
+            [fly.get("best_neighbour", 0) for fly in flies], dtype=self.neighbour_dtype
+        )
+        self.__spread_is_stale = True
 
     def get_best_fly_index(self):
         """Get the index of the best fly in the population."""
         if self.fitness_type == "min":
-            return min(range(len(self.flies)), key=lambda i: self.flies[i]["fitness"])
+            return int(np.argmin(self.fitness))
         else:
-            return max(range(len(self.flies)), key=lambda i: self.flies[i]["fitness"])
+            return int(np.argmax(self.fitness))
 
     def get_best_neighbour_fly_index(self, fly_index: int) -> int:
         """Get the index of the best neighbour fly for a given fly in the population.
@@ -161,32 +928,125 @@ class DFO:
         Returns:
             int: The index of the best neighbour fly for the given fly.
         """
-        left_index = (fly_index - 1) % self.num_flies
-        right_index = (fly_index + 1) % self.num_flies
+        neighbours = self.topology.neighbours(self.num_flies)[fly_index]
         if self.fitness_type == "min":
-            if self.flies[left_index]["fitness"] < self.flies[right_index]["fitness"]:
-                return left_index
-            else:
-                return right_index
+            return int(neighbours[np.argmin(self.fitness[neighbours])])
         else:
-            if self.flies[left_index]["fitness"] > self.flies[right_index]["fitness"]:
-                return left_index
-            else:
-                return right_index
+            return int(neighbours[np.argmax(self.fitness[neighbours])])
+
+    def get_fly(self, fly_index: int) -> Dict:
+        """Get a single fly of the population as a dictionary.
+
+        Args:
+            fly_index (int): The index of the fly in the population.
+
+        Returns:
+            dict: The ``position``, ``fitness`` and ``best_neighbour`` of the fly.
+        """
+        return {
+            "position": tuple(self.positions[fly_index].tolist()),
+            "fitness": self.fitness[fly_index].item(),
+            "best_neighbour": int(self.best_neighbours[fly_index]),
+        }
+
+    def get_thread_speedup(self) -> float:
+        """Get the speedup achieved by the fitness thread pool so far.
+
+        This is the time the positions evaluated by the pool would have taken on the calling
+        thread, estimated from the serial reference chunks, divided by the wall-clock time
+        the pool took. 1.0 means no gain, and fitness functions that hold the GIL or compete
+        with their own multi-threading (e.g. BLAS) can get below 1.0.
+
+        Returns:
+            float: The speedup, or 1.0 if it has not been measured yet.
+        """
+        stats = self.thread_stats
+        if stats["wall_time"] == 0 or stats["serial_positions"] == 0:
+            return 1.0
+        serial_time = stats["serial_time"] / stats["serial_positions"] * stats["positions"]
+        return serial_time / stats["wall_time"]
+
+    def get_snapshot(self, population: bool = False) -> Dict:
+        """Get a lightweight snapshot of the progress of the swarm.
+
+        Args:
+            population (bool, optional): Whether to include the positions and fitness of the
+                whole population, as read-only views of the live arrays rather than copies.
+                They are only valid until the swarm moves again. Defaults to False.
+
+        Returns:
+            dict: The ``epoch`` and ``search_epoch`` counters, the ``best_fitness`` and
+            ``best_position`` of the swarm, its largest ``spread`` and the number of
+            dominant spots found so far (``num_spots``), plus ``positions`` and ``fitness``
+            if requested.
+        """
+        snapshot = {
+            "type": "epoch",
+            "epoch": self.epoch,
+            "search_epoch": self.search_epoch,
+            "best_fitness": self.fitness[self.best_fly_index].item(),
+            "best_position": tuple(self.positions[self.best_fly_index].tolist()),
+            "spread": self.get_spread().max().item(),
+            "num_spots": len(getattr(self, "dominant_spots", [])),
+        }
+        if population:
+            for name in ("positions", "fitness"):
+                view = getattr(self, name).view()
+                view.flags.writeable = False
+                snapshot[name] = view
+        return snapshot
 
-    def init_flies(self):
+    def get_spread(self) -> np.ndarray:
+        """Get the spread (max - min) of the population along every dimension.
+
+        Returns:
+            numpy.ndarray: The spread of each dimension.
+        """
+        if self.__spread_is_stale:
+            self.spread = np.ptp(self.positions, axis=0)
+            self.__spread_is_stale = False
+        return self.spread
+
+    def in_tabu_region(self, positions: np.ndarray, margin: float = 0) -> np.ndarray:
+        """Check which positions lie within ``tabu_radius`` of a tabu center.
+
+        Args:
+            positions (numpy.ndarray): An array of positions, with dims as last axis.
+            margin (float, optional): Extra distance added to the radius, e.g. to also flag
+                the rim around the regions. Defaults to 0.
+
+        Returns:
+            numpy.ndarray: A boolean flag per position.
+        """
+        if not len(self.tabu_centers):
+            return np.zeros(positions.shape[:-1], dtype=bool)
+        offsets = positions[..., None, :] - self.tabu_centers
+        radius = self.tabu_radius + margin
+        return (np.einsum("...ij,...ij->...i", offsets, offsets) <= radius**2).any(axis=-1)
+
+    def init_flies(self, score: bool = True):
         """Initialize the flies in the population with random positions and fitness values.
 
+        Args:
+            score (bool, optional): Whether to score the flies now, otherwise the first ask()
+                and tell() do. Defaults to True.
+
         Returns:
             list: A list of dictionaries representing the flies in the population. Each dictionary contains the
             position and fitness value of a fly.
         """
-        flies = []
-        for _ in range(self.num_flies):
-            pos: Tuple = self.init_position()
-            fitness = self.calculate_fitness(pos)
-            flies.append({"position": pos, "fitness": fitness})
-        return flies
+        self.positions = self.sample_positions((self.num_flies, len(self.dims_range)))
+        self.__spread_is_stale = True
+        if not score or self.external_fitness or self.async_fitness:
+            # The initial population is scored by the first ask() and tell()
+            self.fitness = np.full(self.num_flies, np.nan, dtype=self.fitness_dtype)
+            self.__pending = (np.ones(self.num_flies, dtype=bool), self.positions.copy())
+        else:
+            self.__pending = None
+            self.fitness = self.calculate_population_fitness(self.positions).astype(
+                self.fitness_dtype, copy=False
+            )
+        return self.flies
 
     def init_position(self) -> Tuple:
         """Initialize a random position within the dimensions range.
@@ -194,61 +1054,853 @@ class DFO:
         Returns:
             Tuple: A tuple representing the randomly generated position within the dimensions range.
         """
-        pos = []
-        for i in range(len(self.dims_range)):
-            # Generate random integer position within the range of the dimension
-            pos.append(np.random.randint(self.dims_range[i]))
-        return tuple(pos)
+        return tuple(self.random_positions((len(self.dims_range),)).tolist())
 
-    def update_fly(self, fly_index, cut_off: float = 0.002):
-        position = self.flies[fly_index]["position"]
-        new_position = []
+    def iterate(
+        self,
+        max_spots: int = 5,
+        num_defaults_before_stop: int = 3,
+        suppression_radius: float = 0,
+        tabu_radius: float = None,
+        population_every: int = None,
+    ):
+        """Run as run() does, lazily, yielding a snapshot after every epoch.
+
+        Epoch snapshots come from get_snapshot(). Every ``population_every`` epochs of a search
+        they also hold read-only views of the population arrays, which must be consumed (or
+        copied) before the generator is advanced again. Once a search ends, a ``"spot"``
+        snapshot reports its best fly and whether it was kept as a dominant spot. The
+        optimiser only runs while the generator is advanced, so a consumer such as a WebSocket
+        pushing updates sets its own pace.
+
+        Args:
+            max_spots (int, optional): The maximum number of dominant spots. Defaults to 5.
+            num_defaults_before_stop (int, optional): The number of consecutive defaults before
+                stopping. Defaults to 3.
+            suppression_radius (float, optional): The distance within which two spots are the
+                same. Defaults to 0.
+            tabu_radius (float, optional): The radius of the basins masked around found spots.
+                Defaults to None.
+            population_every (int, optional): The number of epochs between two snapshots with
+                the population. Defaults to None, i.e. never.
+
+        Yields:
+            dict: The epoch and spot snapshots.
 
-        for i, pos in enumerate(position):
-            # Generate random number
-            rand_num = np.random.rand()
+        Returns:
+            list: The dominant spots, as fly dictionaries, as the value of StopIteration.
+        """
+        if population_every is not None and (
+            not isinstance(population_every, int) or population_every <= 0
+        ):
+            raise ValueError("population_every must be a positive integer")
+        self.__start_run(suppression_radius, tabu_radius)
 
-            # Update position based on random number and cut-off value
-            if rand_num < cut_off:
-                new_pos = np.random.randint(self.dims_range[i])
+        while len(self.dominant_spots) < max_spots:
+            for _ in self.__search_epochs():
+                yield self.get_snapshot(
+                    population_every is not None
+                    and self.search_epoch % population_every == 0
+                )
+            best_fly, converged = self.get_fly(self.best_fly_index), self.check_convergence()
+            accepted = self.__add_dominant_spot(best_fly, converged)
+            yield {
+                "type": "spot",
+                "epoch": self.epoch,
+                "spot": best_fly,
+                "converged": converged,
+                "accepted": accepted,
+                "num_spots": len(self.dominant_spots),
+            }
+            if accepted:
+                self.total_defaults = 0
             else:
-                best_neighbour_pos = self.flies[
-                    self.flies[fly_index]["best_neighbour"]
-                ]["position"][i]
-                new_pos = int(
-                    best_neighbour_pos
-                    + np.random.rand()
-                    * (self.flies[self.best_fly_index]["position"][i] - pos)
+                self.total_defaults += 1
+
+            # Stop if the number of defaults exceeds the threshold
+            if self.total_defaults >= num_defaults_before_stop:
+                break
+            if self.__tabu_radius is not None:
+                self.__update_tabu_regions()
+                self.restart()
+        return self.dominant_spots
+
+    def load_checkpoint(self, source):
+        """Restore the state saved by save_checkpoint().
+
+        The DFO must have been built with the same parameters as the one that saved the
+        checkpoint, as the fitness function and matrix are not part of it. If the checkpoint
+        was saved during a run, that run can then be resumed with ``run(resume=True)``.
+
+        Args:
+            source (bytes, str or os.PathLike): The content of the checkpoint or its file.
+
+        Raises:
+            ValueError: If the checkpoint does not match the population or the problem.
+        """
+        state = read_checkpoint(source)
+        # A shrinking population may have retired flies, the full population must match
+        retired_flies = int(state.get("retired_flies", 0))
+        shape = (self.num_flies + self.retired_flies - retired_flies, len(self.dims_range))
+        if state["positions"].shape != shape:
+            raise ValueError(
+                f"The checkpoint holds {state['positions'].shape} positions, not {shape}"
+            )
+        if state["fitness_type"].item() != self.fitness_type:
+            raise ValueError(f"The checkpoint is of a '{state['fitness_type'].item()}' problem")
+
+        self.num_flies, self.retired_flies = shape[0], retired_flies
+        self.cut_off = float(state.get("cut_off", self.disturbance.cut_off))
+        self.positions = state["positions"].astype(self.position_dtype)
+        self.fitness = state["fitness"].astype(self.fitness_dtype)
+        self.best_neighbours = state["best_neighbours"].astype(self.neighbour_dtype)
+        self.best_fly_index = int(state["best_fly_index"])
+        self.__best_fitness = float(state["best_fitness"])
+        self.epoch = int(state["epoch"])
+        self.search_epoch = int(state["search_epoch"])
+        self.stagnant_epochs = int(state["stagnant_epochs"])
+        self.__spread_is_stale = True
+        self.set_tabu_regions(state["tabu_centers"], float(state["tabu_radius"]))
+        decode_rng_state(self.rng, state["rng_state"])
+        # Tables missing from the checkpoint are drawn again, as they would have been
+        tables = {
+            int(key[len("neighbours_"):]): table
+            for key, table in state.items()
+            if key.startswith("neighbours_")
+        }
+        if tables:
+            self.topology.tables = tables
+        elif "neighbours" in state:
+            self.topology.tables[self.num_flies] = state["neighbours"]
+        self.__pending = None
+        if "pending_moving" in state:
+            self.__pending = (state["pending_moving"], state["pending_positions"])
+
+        self.__resumable = "spot_positions" in state
+        if self.__resumable:
+            self.dominant_spots = []
+            self.spot_index = SpotIndex(float(state["suppression_radius"]))
+            for position, fitness, best_neighbour in zip(
+                state["spot_positions"].tolist(),
+                state["spot_fitness"].tolist(),
+                state["spot_best_neighbours"].tolist(),
+            ):
+                self.dominant_spots.append(
+                    {
+                        "position": tuple(position),
+                        "fitness": fitness,
+                        "best_neighbour": best_neighbour,
+                    }
                 )
+                self.spot_index.add(tuple(position))
+            tabu_radius = float(state["run_tabu_radius"])
+            self.__tabu_radius = None if np.isnan(tabu_radius) else tabu_radius
+            self.total_defaults = int(state["total_defaults"])
 
-                # Check if the new position is within the dimensions range
-                if new_pos < 0:
-                    new_pos = 0
-                elif new_pos >= self.dims_range[i]:
-                    new_pos = self.dims_range[i] - 1
+    def update_best_fly(self):
+        """Select the best fly of the population and update the stagnation counter."""
+        self.best_fly_index = self.get_best_fly_index()
+        best_fitness = self.fitness[self.best_fly_index]
+        if self.fitness_type == "min":
+            improvement = self.__best_fitness - best_fitness
+        else:
+            improvement = best_fitness - self.__best_fitness
 
-            new_position.append(new_pos)
+        if improvement > 0:
+            self.__best_fitness = best_fitness
+        if improvement > self.stagnation_tol:
+            self.stagnant_epochs = 0
+        else:
+            self.stagnant_epochs += 1
 
-        self.flies[fly_index]["position"] = tuple(new_position)
+    def update_fly(self, fly_index, cut_off: float = 0.002):
+        """Disperse a single fly and re-evaluate its fitness.
 
-    def run(self, max_spots: int = 5, num_defaults_before_stop: int = 3):
-        dominant_spots = []
-        total_defaults = 0
-        while len(dominant_spots) < max_spots:
-            num_epochs = 0
-            while num_epochs < self.max_iter and not self.check_convergence():
-                self.disperse_flies()
-                self.best_fly_index = self.get_best_fly_index()
-                self.find_best_neighbour()
-                num_epochs += 1
-            if not self.check_convergence() or self.flies[self.best_fly_index] in dominant_spots:
-                logger.warning(f"Fly {self.flies[self.best_fly_index]} is either not converging or is already in the dominant spots")
-                total_defaults += 1
+        Args:
+            fly_index (int): The index of the fly in the population.
+            cut_off (float, optional): The disturbance threshold. Defaults to 0.002.
+        """
+        new_position = self.dispersed_positions(
+            self.positions[fly_index : fly_index + 1],
+            self.positions[self.best_neighbours[fly_index : fly_index + 1]],
+            self.positions[self.best_fly_index],
+            cut_off,
+        )
+        self.positions[fly_index] = new_position[0]
+        self.fitness[fly_index] = self.calculate_fitness(tuple(new_position[0].tolist()))
+        self.__spread_is_stale = True
+
+    def random_positions(self, shape: Tuple) -> np.ndarray:
+        """Draw positions uniformly at random within the bounds of the search space.
+
+        Args:
+            shape (tuple): The shape of the array of positions, with dims as last axis.
+
+        Returns:
+            numpy.ndarray: The random positions.
+        """
+        if self.continuous:
+            positions = self.rng.uniform(self.lower_bounds, self.upper_bounds, size=shape)
+        else:
+            positions = self.rng.integers(
+                self.lower_bounds, self.upper_bounds, size=shape, endpoint=True
+            )
+        return positions.astype(self.position_dtype, copy=False)
+
+    def spawn_rngs(self, n: int) -> List[np.random.Generator]:
+        """Spawn independent random streams from the DFO stream, e.g. for parallel workers.
+
+        Args:
+            n (int): The number of streams.
+
+        Returns:
+            list: The independent random number generators.
+        """
+        return self.rng.spawn(n)
+
+    def sample_positions(self, shape: Tuple, max_attempts: int = 100) -> np.ndarray:
+        """Draw random positions within the bounds, outside of the tabu regions.
+
+        Positions falling in a tabu region are drawn again, up to ``max_attempts`` times; any
+        left after that are kept (and will score the worst fitness).
+
+        Args:
+            shape (tuple): The shape of the array of positions, with dims as last axis.
+            max_attempts (int, optional): The maximum number of redraws. Defaults to 100.
+
+        Returns:
+            numpy.ndarray: The random positions.
+        """
+        positions = self.random_positions(shape)
+        for _ in range(max_attempts):
+            in_tabu = self.in_tabu_region(positions)
+            if not in_tabu.any():
+                break
+            positions[in_tabu] = self.random_positions((int(in_tabu.sum()), shape[-1]))
+        return positions
+
+    def save_checkpoint(self, target=None) -> bytes | None:
+        """Save the whole state of the swarm as a compressed ``.npz`` checkpoint.
+
+        The checkpoint holds the positions, fitness, best fly and neighbours, the neighbour
+        tables of every population size so far, the random stream state, the epoch and
+        stagnation counters, the tabu regions and, during a run, the dominant spots found so
+        far and the run counters.
+
+        Args:
+            target (str or os.PathLike, optional): The checkpoint file. Defaults to None.
+
+        Returns:
+            bytes or None: The content of the checkpoint if no target is given, None otherwise.
+        """
+        state = {
+            "positions": self.positions,
+            "fitness": self.fitness,
+            "best_neighbours": self.best_neighbours,
+            "best_fly_index": np.array(self.best_fly_index),
+            "best_fitness": np.array(self.__best_fitness),
+            "fitness_type": np.array(self.fitness_type),
+            "epoch": np.array(self.epoch),
+            "search_epoch": np.array(self.search_epoch),
+            "stagnant_epochs": np.array(self.stagnant_epochs),
+            "tabu_centers": self.tabu_centers,
+            "tabu_radius": np.array(self.tabu_radius, dtype=np.float64),
+            "rng_state": encode_rng_state(self.rng),
+            "cut_off": np.array(self.cut_off, dtype=np.float64),
+            "retired_flies": np.array(self.retired_flies),
+        }
+        # A random topology draws the table of every new population size from the stream
+        # of the swarm, so a shrinking population needs them all to resume identically
+        for num_flies, table in self.topology.tables.items():
+            state[f"neighbours_{num_flies}"] = np.asarray(table)
+        if self.__pending is not None:
+            state["pending_moving"], state["pending_positions"] = self.__pending
+
+        if getattr(self, "spot_index", None) is not None:
+            spots = self.dominant_spots
+            state.update(
+                spot_positions=np.array(
+                    [spot["position"] for spot in spots], dtype=self.position_dtype
+                ).reshape(len(spots), len(self.dims_range)),
+                spot_fitness=np.array([spot["fitness"] for spot in spots], dtype=np.float64),
+                spot_best_neighbours=np.array(
+                    [spot["best_neighbour"] for spot in spots], dtype=np.int64
+                ),
+                suppression_radius=np.array(self.spot_index.radius, dtype=np.float64),
+                run_tabu_radius=np.array(
+                    np.nan if self.__tabu_radius is None else self.__tabu_radius
+                ),
+                total_defaults=np.array(self.total_defaults),
+            )
+        return write_checkpoint(state, target)
+
+    def set_tabu_regions(self, centers: List | np.ndarray, radius: float):
+        """Mark the basins around some positions as tabu.
+
+        Args:
+            centers (list or numpy.ndarray): The centers of the tabu regions.
+            radius (float): The radius of every tabu region.
+        """
+        self.tabu_centers = np.asarray(centers, dtype=np.float64).reshape(-1, len(self.dims_range))
+        self.tabu_radius = radius
+
+    def restart(self, score: bool = True):
+        """Re-initialise the swarm with new random flies, e.g. before searching for another spot.
+
+        Args:
+            score (bool, optional): Whether to score the new flies now, otherwise the first
+                ask() and tell() do. Defaults to True.
+        """
+        if self.retired_flies:
+            # Bring the retired flies back, their neighbours are found again below
+            self.num_flies += self.retired_flies
+            self.retired_flies = 0
+            self.best_neighbours = np.zeros(self.num_flies, dtype=self.neighbour_dtype)
+        self.cut_off = self.disturbance.cut_off
+        self.init_flies(score)
+        self.epoch = 0
+        if score and not (self.external_fitness or self.async_fitness):
+            self.__select_initial_best_fly()
+
+    def retire_flies(self, keep: np.ndarray):
+        """Remove flies from the swarm until the next restart.
+
+        Args:
+            keep (numpy.ndarray): The indices of the flies that stay, in order.
+        """
+        retired = self.num_flies - len(keep)
+        self.retired_flies += retired
+        self.num_flies = len(keep)
+        self.positions = self.positions[keep]
+        self.fitness = self.fitness[keep]
+        self.__spread_is_stale = True
+        self.best_fly_index = self.get_best_fly_index()
+        self.find_best_neighbour()
+        if self.stats is not None:
+            self.stats.retired_flies += retired
+
+    def __select_initial_best_fly(self):
+        """Select the best fly and neighbours of a freshly initialised population."""
+        self.stagnant_epochs = 0
+        self.best_fly_index = self.get_best_fly_index()
+        self.__best_fitness = self.fitness[self.best_fly_index]
+        self.find_best_neighbour()
+
+    def search(self, resume: bool = False) -> Tuple[Dict, bool]:
+        """Run the swarm until it converges or ``max_iter`` epochs have passed.
+
+        Args:
+            resume (bool, optional): Whether to carry on with the epoch and stagnation counters
+                of an interrupted search, e.g. one restored by load_checkpoint(). Defaults to False.
+
+        Returns:
+            tuple: The best fly of the swarm and whether the swarm converged.
+        """
+        for _ in self.__search_epochs(resume):
+            pass
+        return self.get_fly(self.best_fly_index), self.check_convergence()
+
+    def __search_epochs(self, resume: bool = False):
+        """Advance the swarm one epoch at a time until it converges, yielding after each epoch."""
+        if not resume:
+            self.search_epoch = 0
+            self.stagnant_epochs = 0
+        while self.search_epoch < self.max_iter and not self.check_convergence():
+            self.tell(self.calculate_population_fitness(self.ask()))
+            self.search_epoch += 1
+            result = self.__periodic_checkpoint()
+            if inspect.isawaitable(result):
+                result.close()
+                raise ValueError("The checkpoint callable is asynchronous, use run_async()")
+            yield
+        if self.stats is not None:
+            self.stats.record_search(self.search_epoch)
+
+    async def search_async(
+        self, concurrency: int = 10, resume: bool = False
+    ) -> Tuple[Dict, bool]:
+        """Run the swarm until it converges or ``max_iter`` epochs have passed, asynchronously.
+
+        Args:
+            concurrency (int, optional): The maximum number of concurrent fitness calls.
+                Defaults to 10.
+            resume (bool, optional): Whether to carry on with the counters of an interrupted
+                search. Defaults to False.
+
+        Returns:
+            tuple: The best fly of the swarm and whether the swarm converged.
+        """
+        if not resume:
+            self.search_epoch = 0
+            self.stagnant_epochs = 0
+        while self.search_epoch < self.max_iter and not self.check_convergence():
+            positions = self.ask()
+            self.tell(await self.calculate_population_fitness_async(positions, concurrency))
+            self.search_epoch += 1
+            result = self.__periodic_checkpoint()
+            if inspect.isawaitable(result):
+                await result
+            # Let other tasks run between epochs
+            await asyncio.sleep(0)
+        if self.stats is not None:
+            self.stats.record_search(self.search_epoch)
+        return self.get_fly(self.best_fly_index), self.check_convergence()
+
+    def tell(self, fitness: List | np.ndarray):
+        """Advance the swarm with the fitness of the positions returned by ``ask()``.
+
+        The flies move to the asked positions, then the best fly, the stagnation counter and
+        the best neighbours are updated. Positions within a tabu region get the worst fitness
+        whatever their told value.
+
+        Args:
+            fitness (list or numpy.ndarray): The fitness of every asked position, in order.
+
+        Raises:
+            ValueError: If there are no asked positions or the fitness does not match them.
+        """
+        if self.__pending is None:
+            raise ValueError("tell() must follow ask()")
+        moving, positions = self.__pending
+        fitness = np.asarray(fitness, dtype=np.float64).reshape(-1)
+        if len(fitness) != len(positions):
+            raise ValueError(f"Got {len(fitness)} fitness values for {len(positions)} positions")
+        if len(self.tabu_centers):
+            fitness = np.where(self.in_tabu_region(positions), self.worst_fitness, fitness)
+
+        self.__pending = None
+        self.__move_flies(moving, positions, fitness)
+        if moving.all():
+            self.__select_initial_best_fly()
+        else:
+            self.update_best_fly()
+            self.find_best_neighbour()
+            self.epoch += 1
+            self.__update_schedules()
+        if self.__prefetch is not None:
+            self.__prefetch(self.positions.min(axis=0), self.positions.max(axis=0))
+
+    def run(
+        self,
+        max_spots: int = 5,
+        num_defaults_before_stop: int = 3,
+        workers: int = 1,
+        swarms: int = 1,
+        suppression_radius: float = 0,
+        tabu_radius: float = None,
+        checkpoint=None,
+        checkpoint_every: int = 100,
+        resume: bool = False,
+        engine: str = "swarm",
+        exact_max_cells: int = EXACT_MAX_CELLS,
+    ):
+        """Find up to ``max_spots`` dominant spots, one swarm search per spot.
+
+        A search that does not converge, or whose best fly lies within ``suppression_radius``
+        of a dominant spot already found, counts as a default; the run stops after
+        ``num_defaults_before_stop`` defaults in a row. Found spots are kept in a SpotIndex,
+        and a suppressed fly that is fitter than its nearby spot replaces it (non-maximum
+        suppression).
+
+        With a ``tabu_radius``, the swarm is re-initialised before every search and the basins
+        within that radius of the spots already found are tabu: new flies are drawn outside
+        of them and flies entering them get the worst fitness, so each restart explores new
+        ground instead of landing on a known optimum again.
+
+        With more than one worker, restarts are independent swarms spread across a process
+        pool, each with its own random stream spawned from the DFO one. The fitness_func must
+        then be picklable. Memory-mapped and shared fitness matrices are attached by the
+        workers without copying, an in-RAM ndarray is pickled to each of them.
+
+        With more than one swarm, each round advances that many independent swarms together
+        in a MultiSwarmDFO, yielding several candidate spots per epoch loop.
+
+        In both cases the results are merged in order with the same de-duplication and
+        default counting.
+
+        With a ``checkpoint``, the whole state of a sequential run is saved every
+        ``checkpoint_every`` epochs (see save_checkpoint()), either to a file or by passing the
+        checkpoint bytes to a callable, e.g. to store them in Redis. An interrupted run is
+        resumed by a DFO built with the same parameters, possibly in another process, with
+        load_checkpoint() followed by ``run(resume=True)``; the suppression and tabu radii
+        then come from the checkpoint.
+
+        The 'exact' engine skips the swarm altogether and takes the best local peaks of the
+        fitness matrix with a vectorized scan (see find_peaks()), spots within the
+        suppression or tabu radius of a better one being dropped. Every strict local peak
+        counts, so a noisy or quantised matrix needs a suppression radius to merge the
+        bumps around its real peaks. The 'auto' engine uses it for matrices of at most
+        ``exact_max_cells`` cells, without fitness_func, when the run is neither
+        checkpointed nor resumed, and the swarm otherwise. Both engines return the spots in
+        the same form.
+
+        Args:
+            max_spots (int, optional): The maximum number of dominant spots. Defaults to 5.
+            num_defaults_before_stop (int, optional): The number of consecutive defaults before
+                stopping. With several workers or swarms, a round that adds no new spot is one
+                default. Defaults to 3.
+            workers (int, optional): The number of worker processes, None for one per CPU.
+                Each round runs one search per worker, under the tabu regions of the spots
+                found by the previous rounds. Defaults to 1.
+            swarms (int, optional): The number of swarms advanced together, with the fixed
+                disturbance threshold and the constant population of the DFO. Defaults to 1.
+            suppression_radius (float, optional): The distance within which two spots are the
+                same. Defaults to 0, i.e. only identical positions.
+            tabu_radius (float, optional): The radius of the basins masked around found spots.
+                Defaults to None, i.e. no masking and no restarts.
+            checkpoint (str, os.PathLike or callable, optional): The checkpoint file, or a
+                callable taking the checkpoint bytes. Defaults to None, i.e. no checkpoints.
+            checkpoint_every (int, optional): The number of epochs between two checkpoints.
+                Defaults to 100.
+            resume (bool, optional): Whether to resume the run of a loaded checkpoint.
+                Defaults to False.
+            engine (str, optional): One of 'swarm', 'exact' and 'auto'. Defaults to "swarm".
+            exact_max_cells (int, optional): The largest matrix the 'auto' engine scans
+                exactly. Defaults to EXACT_MAX_CELLS.
+
+        Returns:
+            list: The dominant spots, as fly dictionaries.
+        """
+        if engine not in ["auto", "exact", "swarm"]:
+            raise ValueError("engine must be one of 'auto', 'exact' and 'swarm'")
+        if not isinstance(exact_max_cells, int) or exact_max_cells < 0:
+            raise ValueError("exact_max_cells must be a non-negative integer")
+        scannable = self.fitness_func is None and self.fitness_matrix is not None
+        if engine == "exact" and not scannable:
+            raise ValueError("The exact engine requires a fitness_matrix without fitness_func")
+        if engine == "exact" or (
+            engine == "auto"
+            and scannable
+            and checkpoint is None
+            and not resume
+            and np.prod(self.fitness_matrix.shape) <= exact_max_cells
+        ):
+            self.__start_run(suppression_radius, tabu_radius)
+            self.dominant_spots = find_peaks(
+                self.fitness_matrix[...],
+                max_spots,
+                self.fitness_type,
+                max(suppression_radius, tabu_radius or 0),
+                getattr(self.fitness_matrix, "default", None),
+            )
+            for spot in self.dominant_spots:
+                self.spot_index.add(spot["position"])
+            return self.dominant_spots
+
+        if workers is None:
+            workers = os.cpu_count()
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError("workers must be a positive integer")
+        if not isinstance(swarms, int) or swarms <= 0:
+            raise ValueError("swarms must be a positive integer")
+        if workers > 1 and swarms > 1:
+            raise ValueError("workers and swarms cannot both be greater than 1")
+        if swarms > 1 and (
+            type(self.disturbance) is not DisturbanceSchedule or self.population is not None
+        ):
+            raise ValueError(
+                "swarms greater than 1 require a fixed disturbance and a constant population"
+            )
+        if (checkpoint is not None or resume) and (workers > 1 or swarms > 1):
+            raise ValueError("Checkpoints require a sequential run, with one worker and one swarm")
+
+        self.__start_run(suppression_radius, tabu_radius, checkpoint, checkpoint_every, resume)
+
+        try:
+            if workers > 1:
+                return self.__run_parallel(max_spots, num_defaults_before_stop, workers)
+            if swarms > 1:
+                return self.__run_rounds(
+                    lambda: MultiSwarmDFO(self, swarms).search(self.disturbance.cut_off),
+                    max_spots,
+                    num_defaults_before_stop,
+                )
+
+            while len(self.dominant_spots) < max_spots:
+                best_fly, converged = self.search(resume=resume)
+                resume = False
+                if self.__add_dominant_spot(best_fly, converged):
+                    self.total_defaults = 0
+                else:
+                    self.total_defaults += 1
+
+                # Stop if the number of defaults exceeds the threshold
+                if self.total_defaults >= num_defaults_before_stop:
+                    break
+                if self.__tabu_radius is not None:
+                    self.__update_tabu_regions()
+                    self.restart()
+
+            if self.thread_stats["calls"]:
+                logger.info(f"Fitness thread pool speedup: {self.get_thread_speedup():.2f}x")
+            return self.dominant_spots
+        finally:
+            # A later population worth splitting starts the thread pool again
+            self.close()
+
+    async def run_async(
+        self,
+        max_spots: int = 5,
+        num_defaults_before_stop: int = 3,
+        concurrency: int = 10,
+        suppression_radius: float = 0,
+        tabu_radius: float = None,
+        checkpoint=None,
+        checkpoint_every: int = 100,
+        resume: bool = False,
+    ) -> List[Dict]:
+        """Find up to ``max_spots`` dominant spots without blocking the event loop.
+
+        Same as run(), but each epoch's flies are evaluated by
+        calculate_population_fitness_async, so a coroutine ``fitness_func`` is awaited for
+        all of them concurrently, and control is yielded to the event loop between epochs.
+        A checkpoint callable may also be a coroutine function, e.g. one writing to Redis.
+
+        Args:
+            max_spots (int, optional): The maximum number of dominant spots. Defaults to 5.
+            num_defaults_before_stop (int, optional): The number of consecutive defaults before
+                stopping. Defaults to 3.
+            concurrency (int, optional): The maximum number of concurrent fitness calls.
+                Defaults to 10.
+            suppression_radius (float, optional): The distance within which two spots are the
+                same. Defaults to 0.
+            tabu_radius (float, optional): The radius of the basins masked around found spots.
+                Defaults to None.
+            checkpoint (str, os.PathLike or callable, optional): The checkpoint file, or a
+                callable taking the checkpoint bytes. Defaults to None.
+            checkpoint_every (int, optional): The number of epochs between two checkpoints.
+                Defaults to 100.
+            resume (bool, optional): Whether to resume the run of a loaded checkpoint.
+                Defaults to False.
+
+        Returns:
+            list: The dominant spots, as fly dictionaries.
+        """
+        if not isinstance(concurrency, int) or concurrency <= 0:
+            raise ValueError("concurrency must be a positive integer")
+        self.__start_run(suppression_radius, tabu_radius, checkpoint, checkpoint_every, resume)
+
+        try:
+            while len(self.dominant_spots) < max_spots:
+                best_fly, converged = await self.search_async(concurrency, resume=resume)
+                resume = False
+                if self.__add_dominant_spot(best_fly, converged):
+                    self.total_defaults = 0
+                else:
+                    self.total_defaults += 1
+
+                # Stop if the number of defaults exceeds the threshold
+                if self.total_defaults >= num_defaults_before_stop:
+                    break
+                if self.__tabu_radius is not None:
+                    self.__update_tabu_regions()
+                    # The new flies are scored by search_async(), off the event loop
+                    self.restart(score=False)
+            return self.dominant_spots
+        finally:
+            self.close()
+
+    def run_pyramid(
+        self,
+        max_spots: int = 5,
+        num_defaults_before_stop: int = 3,
+        levels: int = 3,
+        factor: int = 2,
+        local_flies: int = 20,
+        suppression_radius: float = 0,
+        tabu_radius: float = None,
+        engine: str = "swarm",
+    ) -> List[Dict]:
+        """Find up to ``max_spots`` dominant spots of the fitness matrix, coarse to fine.
+
+        The matrix is max-pooled (min-pooled for 'min' problems) into a pyramid once; the swarm
+        runs on the coarsest level and every candidate spot is refined level by level with a
+        small local swarm. See PyramidSearch.
+
+        Args:
+            max_spots (int, optional): The maximum number of dominant spots. Defaults to 5.
+            num_defaults_before_stop (int, optional): The number of consecutive defaults of the
+                coarse run before stopping. Defaults to 3.
+            levels (int, optional): The number of pyramid levels, including the full
+                resolution one. Defaults to 3.
+            factor (int, optional): The reduction factor between two levels. Defaults to 2.
+            local_flies (int, optional): The number of flies of the refining swarms. Defaults to 20.
+            suppression_radius (float, optional): The distance within which two spots are the
+                same. Defaults to 0.
+            tabu_radius (float, optional): The radius of the basins masked around coarse spots.
+                Defaults to None.
+            engine (str, optional): The engine of the coarse run, one of 'swarm', 'exact' and
+                'auto'. 'auto' scans the coarse level exactly whenever it is small enough.
+                Defaults to "swarm".
+
+        Returns:
+            list: The dominant spots, as fly dictionaries.
+        """
+        search = PyramidSearch(self, levels, factor, local_flies)
+        self.dominant_spots = search.run(
+            max_spots, num_defaults_before_stop, suppression_radius, tabu_radius, engine
+        )
+        return self.dominant_spots
+
+    def __start_run(
+        self,
+        suppression_radius: float,
+        tabu_radius: float,
+        checkpoint=None,
+        checkpoint_every: int = 100,
+        resume: bool = False,
+    ):
+        """Reset the dominant spots and the tabu regions at the start of a run, unless resuming."""
+        if checkpoint is not None and not (
+            isinstance(checkpoint, (str, os.PathLike)) or callable(checkpoint)
+        ):
+            raise ValueError("checkpoint must be a path or a callable")
+        if not isinstance(checkpoint_every, int) or checkpoint_every <= 0:
+            raise ValueError("checkpoint_every must be a positive integer")
+        self.__checkpoint = checkpoint
+        self.__checkpoint_every = checkpoint_every
+
+        if resume:
+            if not self.__resumable:
+                raise ValueError("Nothing to resume, load the checkpoint of a run first")
+            self.__resumable = False
+            return
+        self.__resumable = False
+
+        if tabu_radius is not None and (
+            not isinstance(tabu_radius, (int, float)) or tabu_radius < 0
+        ):
+            raise ValueError("tabu_radius must be a non-negative number")
+
+        self.dominant_spots: List[Dict] = []
+        self.spot_index = SpotIndex(suppression_radius)
+        self.total_defaults = 0
+        self.__tabu_radius = tabu_radius
+        if tabu_radius is not None:
+            self.set_tabu_regions([], tabu_radius)
+
+    def __add_dominant_spot(self, best_fly: Dict, converged: bool) -> bool:
+        """Add the best fly of a search to the dominant spots, unless it is a default.
+
+        Returns:
+            bool: True if the fly was added, False if the search counts as a default.
+        """
+        if not converged or not np.isfinite(best_fly["fitness"]):
+            logger.warning(f"Fly {best_fly} is not converging")
+            if self.stats is not None:
+                self.stats.unconverged_searches += 1
+            return False
+
+        # Masked cells score the worst fitness, so swarms also settle on the rim of a tabu
+        # region, which is no optimum of the fitness itself. The rim is one lattice step wide,
+        # convergence_tol wide in continuous mode
+        step = self.convergence_tol if self.continuous else 1
+        if self.in_tabu_region(np.asarray(best_fly["position"], dtype=np.float64), step):
+            logger.warning(f"Fly {best_fly} is on the rim of a tabu region")
+            if self.stats is not None:
+                self.stats.tabu_rim_searches += 1
+            return False
+
+        index = self.spot_index.query(best_fly["position"])
+        if index is not None:
+            spot = self.dominant_spots[index]
+            if self.fitness_type == "min":
+                is_better = best_fly["fitness"] < spot["fitness"]
             else:
-                total_defaults = 0
-                dominant_spots.append(self.flies[self.best_fly_index])
+                is_better = best_fly["fitness"] > spot["fitness"]
+            if is_better:
+                self.dominant_spots[index] = best_fly
+                self.spot_index.replace(index, best_fly["position"])
+            logger.warning(f"Fly {best_fly} is already in the dominant spots")
+            if self.stats is not None:
+                self.stats.duplicate_searches += 1
+            return False
 
-            # Stop if the number of defaults exceeds the threshold
+        self.dominant_spots.append(best_fly)
+        self.spot_index.add(best_fly["position"])
+        return True
+
+    def __run_parallel(
+        self, max_spots: int, num_defaults_before_stop: int, workers: int
+    ) -> List[Dict]:
+        """Run independent restarts in waves of ``workers`` processes and merge their spots."""
+        # Workers map file-backed or shared matrices again instead of receiving a copy
+        params = dict(
+            self.params,
+            fitness_matrix=picklable_fitness_matrix(self.fitness_matrix),
+            stats=self.stats is not None,
+        )
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(params,)
+        ) as executor:
+
+            def next_round():
+                for best_fly, converged, stats in executor.map(
+                    _run_restart,
+                    self.spawn_rngs(workers),
+                    [self.tabu_centers] * workers,
+                    [self.tabu_radius] * workers,
+                ):
+                    # Workers collect their own statistics, merged back into the run's
+                    if stats is not None:
+                        self.stats.merge(stats)
+                    yield best_fly, converged
+
+            return self.__run_rounds(next_round, max_spots, num_defaults_before_stop)
+
+    def __run_rounds(
+        self, next_round, max_spots: int, num_defaults_before_stop: int
+    ) -> List[Dict]:
+        """Merge rounds of independent search results into the dominant spots.
+
+        The searches of a round share the same tabu regions, so several of them often find
+        the same spot. A round is therefore one default if it adds no new spot, whatever the
+        number of its searches.
+
+        Args:
+            next_round (callable): Runs a round of searches and returns their
+                ``(best_fly, converged)`` results, in order.
+            max_spots (int): The maximum number of dominant spots.
+            num_defaults_before_stop (int): The number of consecutive defaulting rounds before
+                stopping.
+
+        Returns:
+            list: The dominant spots, as fly dictionaries.
+        """
+        total_defaults = 0
+        while True:
+            added = False
+            for best_fly, converged in next_round():
+                added |= self.__add_dominant_spot(best_fly, converged)
+                if len(self.dominant_spots) >= max_spots:
+                    return self.dominant_spots
+
+            total_defaults = 0 if added else total_defaults + 1
             if total_defaults >= num_defaults_before_stop:
-                break
-        return dominant_spots
+                return self.dominant_spots
+            if self.__tabu_radius is not None:
+                self.__update_tabu_regions()
+
+    def __update_schedules(self):
+        """Update the disturbance threshold and retire flies, after an epoch."""
+        self.cut_off = self.disturbance.update(self)
+        if self.population is not None:
+            keep = self.population.select(self)
+            if keep is not None:
+                self.retire_flies(keep)
+        if self.stats is not None:
+            self.stats.record_epoch(self.cut_off, self.num_flies)
+
+    def __periodic_checkpoint(self):
+        """Save a checkpoint of the run if one is due at this epoch."""
+        if self.__checkpoint is None or self.search_epoch % self.__checkpoint_every:
+            return None
+        if callable(self.__checkpoint):
+            return self.__checkpoint(self.save_checkpoint())
+        return self.save_checkpoint(self.__checkpoint)
+
+    def __update_tabu_regions(self):
+        """Mask the basins of all the dominant spots found so far."""
+        self.set_tabu_regions(
+            [spot["position"] for spot in self.dominant_spots], self.__tabu_radius
+        )
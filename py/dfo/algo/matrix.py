@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""Fitness matrix backends for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import itertools
+import json
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .cache import FitnessCache
+
+logger = logging.getLogger(__name__)
+
+
+class _UntrackedSharedMemory(shared_memory.SharedMemory):
+    """POSIX shared memory block attached without registering it with the resource tracker.
+
+    Before Python 3.13, SharedMemory registers every block it attaches to, and the tracker
+    unlinks them when the process exits. This is its attach path without the registration.
+    """
+
+    def __init__(self, name: str):
+        self._name = "/" + name
+        self._fd = shared_memory._posixshmem.shm_open(self._name, self._flags, mode=self._mode)
+        try:
+            self._size = os.fstat(self._fd).st_size
+            self._mmap = mmap.mmap(self._fd, self._size)
+        except OSError:
+            os.close(self._fd)
+            raise
+        self._buf = memoryview(self._mmap)
+
+
+class MemmapReference:
+    """Picklable reference to a memory-mapped fitness matrix.
+
+    Pickling a ``numpy.memmap`` copies its whole content, so worker processes are given this
+    reference instead and map the file again themselves. Only the touched pages are loaded.
+    """
+
+    def __init__(
+        self, filename: str, dtype, shape: Tuple, offset: int = 0, order: str = "C"
+    ):
+        self.filename = filename
+        self.dtype = np.dtype(dtype)
+        self.shape = tuple(shape)
+        self.offset = offset
+        self.order = order
+
+    @classmethod
+    def from_memmap(cls, matrix: np.memmap) -> "MemmapReference":
+        """Build the reference of an existing memory map.
+
+        Args:
+            matrix (numpy.memmap): The memory-mapped matrix.
+
+        Returns:
+            MemmapReference: The reference to the same file region.
+        """
+        order = "F" if matrix.flags.f_contiguous and not matrix.flags.c_contiguous else "C"
+        return cls(matrix.filename, matrix.dtype, matrix.shape, matrix.offset, order)
+
+    def open(self) -> np.memmap:
+        """Map the referenced file, read-only.
+
+        Returns:
+            numpy.memmap: The memory-mapped matrix.
+        """
+        return np.memmap(
+            self.filename,
+            dtype=self.dtype,
+            mode="r",
+            offset=self.offset,
+            shape=self.shape,
+            order=self.order,
+        )
+
+
+class SharedFitnessMatrix:
+    """Fitness matrix held in a ``multiprocessing.shared_memory`` block.
+
+    The matrix behaves like a read-only ndarray (``shape``, ``dtype`` and indexing). When it
+    is pickled, only the block name, shape and dtype are sent, and the receiving process
+    attaches to the same memory without copying. The process that created the block owns
+    it and must ``unlink()`` it once every worker is done.
+    """
+
+    def __init__(self, name: str, shape: Tuple, dtype):
+        self.name = name
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.__shm = None
+        self.__array = None
+
+    @classmethod
+    def create(cls, matrix: np.ndarray) -> "SharedFitnessMatrix":
+        """Copy a matrix into a new shared memory block.
+
+        Args:
+            matrix (numpy.ndarray): The fitness matrix.
+
+        Returns:
+            SharedFitnessMatrix: The shared matrix, owning the new block.
+        """
+        matrix = np.asarray(matrix)
+        shm = shared_memory.SharedMemory(create=True, size=max(matrix.nbytes, 1))
+        shared = cls(shm.name, matrix.shape, matrix.dtype)
+        shared.__shm = shm
+        shared.__array = np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=shm.buf)
+        shared.__array[...] = matrix
+        shared.__array.flags.writeable = False
+        return shared
+
+    @property
+    def array(self) -> np.ndarray:
+        """The matrix as an ndarray over the shared block, attaching to it on first use."""
+        if self.__array is None:
+            self.__shm = self.__attach(self.name)
+            self.__array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.__shm.buf)
+            self.__array.flags.writeable = False
+        return self.__array
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __attach(self, name: str) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching also registers the block with the resource
+            # tracker, which would unlink it when this process exits. Pool workers share
+            # the tracker of their parent, so unregistering afterwards would drop the
+            # registration of the owner: attach without registering instead. Only POSIX
+            # blocks are registered
+            if os.name != "posix":
+                return shared_memory.SharedMemory(name=name)
+            return _UntrackedSharedMemory(name)
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __getstate__(self):
+        return {"name": self.name, "shape": self.shape, "dtype": self.dtype.str}
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 0
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["shape"], state["dtype"])
+
+    def close(self):
+        """Detach this process from the shared block."""
+        self.__array = None
+        if self.__shm is not None:
+            self.__shm.close()
+            self.__shm = None
+
+    def unlink(self):
+        """Release the shared block, to be called by its owner once every worker is done."""
+        shm = self.__shm or shared_memory.SharedMemory(name=self.name)
+        self.__array = None
+        self.__shm = None
+        shm.close()
+        shm.unlink()
+
+
+class _GatheredFitnessMatrix:
+    """Read-only ndarray indexing of a fitness matrix that looks its values up with gather().
+
+    Whole positions, or arrays of positions as in ``matrix[tuple(positions.T)]``, are passed
+    to gather() at once, while slices are returned as dense blocks. Subclasses set ``shape``
+    and implement gather().
+    """
+
+    shape: Tuple
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index,)
+        if any(isinstance(item, slice) or item is Ellipsis for item in index) or (
+            len(index) < self.ndim and all(np.ndim(item) == 0 for item in index)
+        ):
+            return self.__block(index)
+        if len(index) != self.ndim:
+            raise IndexError(f"{type(self).__name__} is indexed by whole positions or slices")
+        return self.gather(index)[()]
+
+    def __len__(self) -> int:
+        return self.shape[0] if self.shape else 0
+
+    def __block(self, index: Tuple) -> np.ndarray:
+        """Get a dense block of the matrix, indexed by integers, slices and an Ellipsis."""
+        if Ellipsis in index:
+            at = index.index(Ellipsis)
+            index = index[:at] + (slice(None),) * (self.ndim - len(index) + 1) + index[at + 1 :]
+        index = index + (slice(None),) * (self.ndim - len(index))
+        ranges = [np.arange(extent)[item] for item, extent in zip(index, self.shape)]
+        block = self.gather(np.ix_(*map(np.atleast_1d, ranges)))
+        return block.reshape([len(r) for r in ranges if np.ndim(r)])
+
+    def gather(self, coords: Tuple) -> np.ndarray:
+        raise NotImplementedError
+
+
+class SparseFitnessMatrix(_GatheredFitnessMatrix):
+    """Fitness matrix holding only its entries that differ from a default value.
+
+    The entries are stored as the sorted linear indices of their positions and their
+    values, so memory grows with the number of entries rather than with the volume of the
+    search space. The matrix behaves like a read-only ndarray: a whole position, or arrays
+    of positions as in ``matrix[tuple(positions.T)]``, are looked up with a vectorized binary
+    search, while slices are returned as dense blocks.
+    """
+
+    def __init__(self, coords, values, shape: Tuple, default: float = 0.0):
+        self.shape = tuple(int(extent) for extent in shape)
+        self.default = default
+        if int(np.prod(self.shape, dtype=object)) >= np.iinfo(np.int64).max:
+            raise ValueError("The matrix has too many cells to be indexed with 64-bit integers")
+
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, len(self.shape))
+        values = np.asarray(values).reshape(-1)
+        if len(coords) != len(values):
+            raise ValueError("coords and values must have the same number of entries")
+        if np.any(coords < 0) or np.any(coords >= np.array(self.shape)):
+            raise ValueError("coords must lie within the shape of the matrix")
+
+        # The first value of a repeated position wins
+        keys, first = np.unique(np.ravel_multi_index(coords.T, self.shape), return_index=True)
+        self.keys: np.ndarray = keys
+        self.dtype = np.result_type(values, default)
+        self.values: np.ndarray = values[first].astype(self.dtype)
+
+    @classmethod
+    def from_dict(
+        cls, mapping: Dict[Tuple, float], shape: Tuple, default: float = 0.0
+    ) -> "SparseFitnessMatrix":
+        """Build a sparse matrix from a position to value mapping.
+
+        Args:
+            mapping (dict): The values of the entries, keyed on their positions.
+            shape (tuple): The shape of the matrix.
+            default (float, optional): The value of the missing entries. Defaults to 0.0.
+
+        Returns:
+            SparseFitnessMatrix: The sparse matrix.
+        """
+        coords = np.array(list(mapping.keys()), dtype=np.int64).reshape(-1, len(shape))
+        return cls(coords, np.array(list(mapping.values())), shape, default)
+
+    @classmethod
+    def from_sparse(cls, matrix, default: float = None) -> "SparseFitnessMatrix":
+        """Build a sparse matrix from a SciPy sparse matrix or array, or a pydata ``sparse`` array.
+
+        Args:
+            matrix: Any object with a ``tocoo()`` method (SciPy), whose repeated coordinates
+                are summed, or with ``coords`` and ``data`` (pydata ``sparse.COO``).
+            default (float, optional): The value of the missing entries. Defaults to the
+                ``fill_value`` of the matrix if it has one, 0.0 otherwise.
+
+        Returns:
+            SparseFitnessMatrix: The sparse matrix.
+        """
+        if default is None:
+            default = getattr(matrix, "fill_value", 0.0)
+        if hasattr(matrix, "tocoo"):
+            # SciPy sums the values of repeated coordinates, on a copy of the caller's matrix
+            matrix = matrix.tocoo(copy=True)
+            matrix.sum_duplicates()
+        if hasattr(matrix, "coords"):
+            coords = np.column_stack(matrix.coords)
+        else:
+            coords = np.column_stack([matrix.row, matrix.col])
+        return cls(coords, matrix.data, matrix.shape, default)
+
+    @property
+    def nnz(self) -> int:
+        """The number of stored entries."""
+        return len(self.keys)
+
+    def gather(self, coords: Tuple) -> np.ndarray:
+        """Look up the values at some positions.
+
+        Args:
+            coords (tuple): One (broadcastable) integer array of coordinates per dimension.
+
+        Returns:
+            numpy.ndarray: The values, shaped as the broadcast coordinates.
+        """
+        return self.lookup(np.ravel_multi_index(np.broadcast_arrays(*coords), self.shape))
+
+    def lookup(self, keys: np.ndarray) -> np.ndarray:
+        """Look up the values at some linear indices.
+
+        Args:
+            keys (numpy.ndarray): The linear (C-order) indices of the positions.
+
+        Returns:
+            numpy.ndarray: The values, shaped as the indices, with the default where there is
+            no entry.
+        """
+        keys = np.asarray(keys)
+        found = np.searchsorted(self.keys, keys)
+        found = np.minimum(found, len(self.keys) - 1)
+        values = np.full(keys.shape, self.default, dtype=self.dtype)
+        if len(self.keys):
+            hit = self.keys[found] == keys
+            values[hit] = self.values[found[hit]]
+        return values
+
+    def toarray(self) -> np.ndarray:
+        """Get the whole matrix as a dense ndarray."""
+        dense = np.full(self.shape, self.default, dtype=self.dtype)
+        dense.reshape(-1)[self.keys] = self.values
+        return dense
+
+
+class TiledFitnessMatrix(_GatheredFitnessMatrix):
+    """Fitness matrix read tile by tile from a directory of ``.npy`` files.
+
+    The directory holds a ``tiles.json`` file describing the matrix and one ``.npy`` file per
+    tile, missing tiles being filled with the default value. Decoded tiles are kept in a
+    bounded LRU cache, so a matrix larger than RAM is searched while only the tiles around
+    the flies are loaded. ``prefetch()`` loads the tiles around a bounding box in a background
+    thread; the DFO calls it with the bounding box of the swarm after every epoch.
+
+    Only the directory and cache settings are pickled, so worker processes open the tiles
+    themselves.
+    """
+
+    METADATA = "tiles.json"
+
+    def __init__(self, directory: str, cache_tiles: int = 64, prefetch_margin: int = 1):
+        if not isinstance(cache_tiles, int) or cache_tiles <= 0:
+            raise ValueError("cache_tiles must be a positive integer")
+        if not isinstance(prefetch_margin, int) or prefetch_margin < 0:
+            raise ValueError("prefetch_margin must be a non-negative integer")
+
+        self.directory = os.fspath(directory)
+        with open(os.path.join(self.directory, self.METADATA)) as file:
+            metadata = json.load(file)
+        self.shape = tuple(metadata["shape"])
+        self.tile_shape = tuple(metadata["tile_shape"])
+        self.dtype = np.dtype(metadata["dtype"])
+        self.default = metadata["default"]
+        self.grid = tuple(-(-extent // tile) for extent, tile in zip(self.shape, self.tile_shape))
+
+        self.cache_tiles = cache_tiles
+        self.prefetch_margin = prefetch_margin
+        self.tiles = FitnessCache(max_size=cache_tiles)
+        self.__lock = threading.Lock()
+        self.__loading: Dict[int, Future] = {}
+        self.__executor = None
+
+    @classmethod
+    def write(
+        cls, directory: str, matrix, tile_shape: Tuple, default: float = 0.0, **kwargs
+    ) -> "TiledFitnessMatrix":
+        """Split a matrix into a tile directory.
+
+        The matrix is read one tile at a time, so it may itself be a memory map or any
+        array-like supporting slicing. Tiles holding only the default value are not written.
+
+        Args:
+            directory (str): The tile directory, created if needed.
+            matrix: The N-dimensional fitness matrix.
+            tile_shape (tuple): The shape of the tiles.
+            default (float, optional): The value of the missing tiles. Defaults to 0.0.
+            **kwargs: The cache settings of the returned matrix.
+
+        Returns:
+            TiledFitnessMatrix: The tiled matrix.
+        """
+        directory = os.fspath(directory)
+        shape = tuple(matrix.shape)
+        if len(tile_shape) != len(shape) or any(tile <= 0 for tile in tile_shape):
+            raise ValueError("tile_shape must hold a positive extent per dimension")
+        os.makedirs(directory, exist_ok=True)
+
+        grid = [range(0, extent, tile) for extent, tile in zip(shape, tile_shape)]
+        for origin in itertools.product(*grid):
+            block = np.asarray(
+                matrix[tuple(slice(o, o + tile) for o, tile in zip(origin, tile_shape))]
+            )
+            if not np.all(block == default):
+                tile = tuple(o // t for o, t in zip(origin, tile_shape))
+                np.save(cls.tile_path(directory, tile), block)
+
+        with open(os.path.join(directory, cls.METADATA), "w") as file:
+            json.dump(
+                {
+                    "shape": shape,
+                    "tile_shape": tuple(tile_shape),
+                    "dtype": np.dtype(matrix.dtype).str,
+                    "default": default,
+                },
+                file,
+            )
+        return cls(directory, **kwargs)
+
+    @staticmethod
+    def tile_path(directory: str, tile: Tuple) -> str:
+        """Get the file of a tile, given by its position in the tile grid."""
+        return os.path.join(directory, "tile_" + "_".join(map(str, tile)) + ".npy")
+
+    def __getstate__(self):
+        return {
+            "directory": self.directory,
+            "cache_tiles": self.cache_tiles,
+            "prefetch_margin": self.prefetch_margin,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def close(self):
+        """Stop the prefetching thread and drop the cached tiles."""
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        with self.__lock:
+            self.tiles.clear()
+
+    def gather(self, coords: Tuple) -> np.ndarray:
+        """Look up the values at some positions, going through each tile they fall in once.
+
+        Args:
+            coords (tuple): One (broadcastable) integer array of coordinates per dimension.
+
+        Returns:
+            numpy.ndarray: The values, shaped as the broadcast coordinates.
+        """
+        coords = np.broadcast_arrays(*(np.asarray(c, dtype=np.int64) for c in coords))
+        shape = coords[0].shape
+        coords = [c.reshape(-1) for c in coords]
+        tile_ids = np.ravel_multi_index(
+            [c // tile for c, tile in zip(coords, self.tile_shape)], self.grid
+        )
+        values = np.empty(len(tile_ids), dtype=self.dtype)
+        if not len(tile_ids):
+            return values.reshape(shape)
+
+        # Group the positions by tile with a single sort
+        order = np.argsort(tile_ids, kind="stable")
+        tile_ids = tile_ids[order]
+        starts = np.flatnonzero(np.diff(tile_ids)) + 1
+        for tile_id, selected in zip(
+            tile_ids[np.r_[0, starts]].tolist(), np.split(order, starts)
+        ):
+            values[selected] = self.tile(tile_id)[
+                tuple(c[selected] % tile for c, tile in zip(coords, self.tile_shape))
+            ]
+        return values.reshape(shape)
+
+    def prefetch(self, lower: np.ndarray, upper: np.ndarray):
+        """Load the tiles around a bounding box in the background.
+
+        The tiles overlapping the box, plus ``prefetch_margin`` tiles on every side, are
+        loaded by a background thread unless they are cached already. Nothing is done while
+        the box spans more tiles than half of the cache, e.g. before the swarm has gathered.
+
+        Args:
+            lower (numpy.ndarray): The lower corner of the box.
+            upper (numpy.ndarray): The upper corner of the box.
+        """
+        first = np.floor_divide(lower, self.tile_shape).astype(np.int64) - self.prefetch_margin
+        last = np.floor_divide(upper, self.tile_shape).astype(np.int64) + self.prefetch_margin
+        first = np.maximum(first, 0)
+        last = np.minimum(last, np.array(self.grid) - 1)
+        if np.prod(last - first + 1) > self.cache_tiles // 2:
+            return
+
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dfo-tiles")
+        for tile in itertools.product(*(range(a, b + 1) for a, b in zip(first, last))):
+            tile_id = int(np.ravel_multi_index(tile, self.grid))
+            with self.__lock:
+                if tile_id in self.tiles.entries or tile_id in self.__loading:
+                    continue
+                self.__loading[tile_id] = self.__executor.submit(self.__prefetch_tile, tile_id)
+
+    def tile(self, tile_id: int) -> np.ndarray:
+        """Get a decoded tile through the LRU cache.
+
+        Args:
+            tile_id (int): The linear index of the tile in the tile grid.
+
+        Returns:
+            numpy.ndarray: The tile.
+        """
+        with self.__lock:
+            tile = self.tiles.get(tile_id)
+            loading = self.__loading.get(tile_id)
+        if tile is not None:
+            return tile
+        if loading is not None:
+            return loading.result()
+
+        tile = self.__load(tile_id)
+        with self.__lock:
+            self.tiles.set(tile_id, tile)
+        return tile
+
+    def __load(self, tile_id: int) -> np.ndarray:
+        """Read a tile from its file, or fill it with the default value if it has none."""
+        tile = np.unravel_index(tile_id, self.grid)
+        path = self.tile_path(self.directory, tile)
+        if os.path.exists(path):
+            return np.load(path)
+        shape = [
+            min(size, extent - t * size)
+            for t, size, extent in zip(tile, self.tile_shape, self.shape)
+        ]
+        return np.full(shape, self.default, dtype=self.dtype)
+
+    def __prefetch_tile(self, tile_id: int) -> np.ndarray:
+        try:
+            tile = self.__load(tile_id)
+            with self.__lock:
+                self.tiles.set(tile_id, tile)
+            return tile
+        finally:
+            with self.__lock:
+                self.__loading.pop(tile_id, None)
+
+
+def open_fitness_matrix(source):
+    """Open a fitness matrix given as a path or a reference, leaving other matrices as they are.
+
+    ``.npy`` files are memory-mapped read-only, so only the touched pages are loaded. Tile
+    directories are opened as a TiledFitnessMatrix. SciPy and pydata sparse matrices are
+    wrapped in a SparseFitnessMatrix, without densifying them.
+
+    Args:
+        source: A path to a ``.npy`` file or a tile directory, a MemmapReference, a sparse
+            matrix or a matrix.
+
+    Returns:
+        The fitness matrix.
+
+    Raises:
+        ValueError: If the path is neither a ``.npy`` file nor a tile directory.
+    """
+    if isinstance(source, MemmapReference):
+        return source.open()
+    if isinstance(source, (str, os.PathLike)):
+        if os.path.isfile(os.path.join(source, TiledFitnessMatrix.METADATA)):
+            return TiledFitnessMatrix(source)
+        if not os.fspath(source).endswith(".npy"):
+            raise ValueError("fitness_matrix paths must point to a .npy file or a tile directory")
+        return np.load(source, mmap_mode="r")
+    # Arrays, masked ones included, are dense. Pydata arrays have both ``coords`` and a
+    # ``fill_value``, either alone is also found on labelled or masked arrays
+    if isinstance(source, np.ndarray):
+        return source
+    if hasattr(source, "tocoo") or (hasattr(source, "coords") and hasattr(source, "fill_value")):
+        return SparseFitnessMatrix.from_sparse(source)
+    return source
+
+
+def picklable_fitness_matrix(matrix):
+    """Get a version of a fitness matrix that is cheap to send to worker processes.
+
+    Args:
+        matrix: The fitness matrix.
+
+    Returns:
+        A MemmapReference for file-backed memory maps, the matrix itself otherwise.
+    """
+    if isinstance(matrix, np.memmap) and matrix.filename is not None:
+        return MemmapReference.from_memmap(matrix)
+    return matrix
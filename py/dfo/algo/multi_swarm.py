@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Batched multi-swarm engine for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MultiSwarmDFO:
+    """Several independent swarms of a DFO problem, advanced together in one array.
+
+    The state is held as ``(swarms, num_flies, dims)`` positions and ``(swarms, num_flies)``
+    fitness. Every epoch disperses the flies of all the active swarms at once and scores
+    them with a single call to the problem's population fitness. Each swarm keeps its own
+    best fly, convergence flag and stagnation counter, and converged swarms are masked out
+    of later epochs.
+
+    The problem definition (fitness, bounds, topology and convergence criteria) is taken
+    from the given DFO instance.
+    """
+
+    def __init__(self, dfo, num_swarms: int):
+        if not isinstance(num_swarms, int) or num_swarms <= 0:
+            raise ValueError("num_swarms must be a positive integer")
+
+        self.dfo = dfo
+        self.num_swarms = num_swarms
+        self.init_swarms()
+
+    def init_swarms(self):
+        """Initialize every swarm with random positions and their fitness values."""
+        dfo = self.dfo
+        shape = (self.num_swarms, dfo.num_flies, len(dfo.dims_range))
+        self.positions: np.ndarray = dfo.sample_positions(shape)
+        self.fitness: np.ndarray = (
+            dfo.calculate_population_fitness(self.positions.reshape(-1, shape[-1]))
+            .reshape(shape[:2])
+            .astype(dfo.fitness_dtype, copy=False)
+        )
+
+        self.active: np.ndarray = np.ones(self.num_swarms, dtype=bool)
+        self.epochs: np.ndarray = np.zeros(self.num_swarms, dtype=np.int64)
+        self.stagnant_epochs: np.ndarray = np.zeros(self.num_swarms, dtype=np.int64)
+        self.best_fly_indices: np.ndarray = self.get_best_fly_indices()
+        self.best_fitness: np.ndarray = self.fitness[
+            np.arange(self.num_swarms), self.best_fly_indices
+        ]
+        self.best_neighbours: np.ndarray = dfo.topology.best_neighbours(
+            self.fitness, dfo.fitness_type
+        ).astype(dfo.neighbour_dtype, copy=False)
+        self.converged: np.ndarray = self.check_convergence()
+
+    def check_convergence(self) -> np.ndarray:
+        """Check which swarms have converged, as in DFO.check_convergence.
+
+        Returns:
+            numpy.ndarray: A boolean flag per swarm.
+        """
+        dfo = self.dfo
+        spread = np.ptp(self.positions, axis=1).max(axis=-1)
+        converged = spread <= dfo.convergence_tol
+        if dfo.stagnation_epochs is not None:
+            converged |= self.stagnant_epochs >= dfo.stagnation_epochs
+        return converged
+
+    def get_best_fly_indices(self) -> np.ndarray:
+        """Get the index of the best fly of every swarm."""
+        if self.dfo.fitness_type == "min":
+            return np.argmin(self.fitness, axis=1)
+        return np.argmax(self.fitness, axis=1)
+
+    def get_best_flies(self) -> List[Dict]:
+        """Get the best fly of every swarm, as DFO fly dictionaries."""
+        best_flies = []
+        for swarm, index in enumerate(self.best_fly_indices):
+            best_flies.append(
+                {
+                    "position": tuple(self.positions[swarm, index].tolist()),
+                    "fitness": self.fitness[swarm, index].item(),
+                    "best_neighbour": int(self.best_neighbours[swarm, index]),
+                }
+            )
+        return best_flies
+
+    def step(self, cut_off: float = 0.002):
+        """Advance every active swarm by one epoch.
+
+        Args:
+            cut_off (float, optional): The disturbance threshold. Defaults to 0.002.
+        """
+        dfo = self.dfo
+        swarms = np.flatnonzero(self.active)
+        if len(swarms) == 0:
+            return
+
+        positions = self.positions[swarms]
+        shape = positions.shape
+        best_positions = positions[np.arange(len(swarms)), self.best_fly_indices[swarms]]
+        neighbour_positions = np.take_along_axis(
+            positions, self.best_neighbours[swarms][..., None], axis=1
+        )
+        new_positions = dfo.dispersed_positions(
+            positions, neighbour_positions, best_positions[:, None, :], cut_off
+        )
+
+        # The best fly of each swarm stays where it is
+        moving = np.arange(shape[1]) != self.best_fly_indices[swarms][:, None]
+        fitness = self.fitness[swarms]
+        positions[moving] = new_positions[moving]
+        fitness[moving] = dfo.calculate_population_fitness(new_positions[moving])
+        self.positions[swarms] = positions
+        self.fitness[swarms] = fitness
+
+        self.__update_best_flies(swarms)
+        self.best_neighbours[swarms] = dfo.topology.best_neighbours(fitness, dfo.fitness_type)
+        self.epochs[swarms] += 1
+
+    def __update_best_flies(self, swarms: np.ndarray):
+        """Select the best fly of the given swarms and update their stagnation counters."""
+        dfo = self.dfo
+        if dfo.fitness_type == "min":
+            self.best_fly_indices[swarms] = np.argmin(self.fitness[swarms], axis=1)
+        else:
+            self.best_fly_indices[swarms] = np.argmax(self.fitness[swarms], axis=1)
+        best_fitness = self.fitness[swarms, self.best_fly_indices[swarms]]
+        if dfo.fitness_type == "min":
+            improvement = self.best_fitness[swarms] - best_fitness
+        else:
+            improvement = best_fitness - self.best_fitness[swarms]
+
+        improved = improvement > 0
+        self.best_fitness[swarms[improved]] = best_fitness[improved]
+        stagnant = improvement <= dfo.stagnation_tol
+        self.stagnant_epochs[swarms] = np.where(stagnant, self.stagnant_epochs[swarms] + 1, 0)
+
+    def search(self, cut_off: float = 0.002) -> List[Tuple[Dict, bool]]:
+        """Run every swarm until it converges or ``max_iter`` epochs have passed.
+
+        Args:
+            cut_off (float, optional): The disturbance threshold. Defaults to 0.002.
+
+        Returns:
+            list: The best fly of every swarm and whether that swarm converged.
+        """
+        self.converged = self.check_convergence()
+        self.active = ~self.converged & (self.epochs < self.dfo.max_iter)
+        while self.active.any():
+            self.step(cut_off)
+            self.converged = self.check_convergence()
+            self.active = ~self.converged & (self.epochs < self.dfo.max_iter)
+        if self.dfo.stats is not None:
+            for epochs in self.epochs.tolist():
+                self.dfo.stats.record_search(epochs)
+        return list(zip(self.get_best_flies(), self.converged.tolist()))
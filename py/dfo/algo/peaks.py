@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Exact peak finder for small Dispersive Fly Optimization (DFO) fitness matrices.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import itertools
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from .spots import SpotIndex
+
+logger = logging.getLogger(__name__)
+
+# Matrices up to this many cells are scanned exactly by the 'auto' engine, around where the
+# scan stops beating a swarm on cheap matrix lookups
+EXACT_MAX_CELLS = 1 << 20
+
+
+def local_peaks(
+    matrix: np.ndarray, fitness_type: str = "max", background: float = None
+) -> np.ndarray:
+    """Find the local peaks of a fitness matrix, one per plateau.
+
+    The neighbourhood is the 3^dims block around every cell, computed as one sliding
+    maximum (minimum for 'min' problems) per dimension. Connected cells of equal value form
+    a plateau, which is a peak when none of its cells touches a better cell, so the
+    shoulders of a slope are not peaks. Every peak is reported at the first cell of its
+    plateau in raster order. Cells of the worst value, as well as cells equal to
+    ``background``, are flat background and never peaks.
+
+    Args:
+        matrix (numpy.ndarray): The N-dimensional fitness matrix.
+        fitness_type (str, optional): Either 'min' or 'max'. Defaults to "max".
+        background (float, optional): The background value of the matrix, e.g. the default
+            value of a sparse matrix. Defaults to None.
+
+    Returns:
+        numpy.ndarray: A ``(peaks, dims)`` array of the peak positions, in raster order.
+    """
+    values = np.asarray(matrix, dtype=np.float64)
+    eligible = np.isfinite(values)
+    if background is not None:
+        eligible &= values != background
+    if fitness_type == "min":
+        values = -values
+    if eligible.any():
+        eligible &= values != values[eligible].min()
+    padded = np.pad(values, 1, constant_values=-np.inf)
+
+    best = padded
+    for axis, extent in enumerate(values.shape):
+        windows = [best[(slice(None),) * axis + (slice(o, o + extent),)] for o in range(3)]
+        best = np.maximum(np.maximum(windows[0], windows[1]), windows[2])
+    candidates = (values >= best).ravel()
+
+    # Pairs of neighbouring eligible cells of equal value, each pair once
+    cells = np.arange(values.size).reshape(values.shape)
+    padded_cells = np.pad(cells, 1, constant_values=-1)
+    padded_eligible = np.pad(eligible, 1)
+    first, second = [], []
+    for offset in itertools.product((-1, 0, 1), repeat=values.ndim):
+        if offset >= (0,) * values.ndim:
+            continue
+        shifted = tuple(slice(1 + o, 1 + o + extent) for o, extent in zip(offset, values.shape))
+        equal = eligible & padded_eligible[shifted] & (padded[shifted] == values)
+        first.append(cells[equal])
+        second.append(padded_cells[shifted][equal])
+    labels = _plateau_labels(values.size, np.concatenate(first), np.concatenate(second))
+
+    # A plateau is rejected as soon as one of its cells has a better neighbour
+    rejected = np.zeros(values.size, dtype=bool)
+    rejected[labels[~candidates]] = True
+    peaks = eligible.ravel() & ~rejected[labels] & (labels == cells.ravel())
+    return np.argwhere(peaks.reshape(values.shape))
+
+
+def _plateau_labels(size: int, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Label the connected plateaus of a matrix from the pairs of equal neighbouring cells.
+
+    Components are merged by hooking the larger root of every pair under the smaller one and
+    compressing the paths, until no pair joins two roots.
+
+    Returns:
+        numpy.ndarray: The label of every cell, the first (smallest) cell of its plateau.
+    """
+    labels = np.arange(size)
+    while len(first):
+        low = np.minimum(labels[first], labels[second])
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[first], low)
+        np.minimum.at(hooked, labels[second], low)
+        while True:
+            compressed = hooked[hooked]
+            if np.array_equal(compressed, hooked):
+                break
+            hooked = compressed
+        if np.array_equal(hooked, labels):
+            break
+        labels = hooked
+    return labels
+
+
+def find_peaks(
+    matrix: np.ndarray,
+    max_spots: int,
+    fitness_type: str = "max",
+    suppression_radius: float = 0,
+    background: float = None,
+) -> List[Dict]:
+    """Find the ``max_spots`` best local peaks of a fitness matrix, exactly.
+
+    Peaks are taken best first, skipping those within ``suppression_radius`` of a peak
+    already taken. Only the best candidates are sorted (partial sort), and more of them are
+    sorted if suppression rejects too many.
+
+    Args:
+        matrix (numpy.ndarray): The N-dimensional fitness matrix.
+        max_spots (int): The maximum number of peaks.
+        fitness_type (str, optional): Either 'min' or 'max'. Defaults to "max".
+        suppression_radius (float, optional): The distance within which two peaks are the
+            same. Defaults to 0.
+        background (float, optional): The background value of the matrix, see
+            local_peaks(). Defaults to None.
+
+    Returns:
+        list: The peaks as DFO fly dictionaries, best first. There is no swarm, so their
+        ``best_neighbour`` is -1.
+    """
+    if max_spots <= 0:
+        return []
+    positions = local_peaks(matrix, fitness_type, background)
+    values = np.asarray(matrix[tuple(positions.T)], dtype=np.float64)
+    keys = values if fitness_type == "min" else -values
+
+    count = 2 * max_spots
+    while True:
+        if count < len(keys):
+            top = np.sort(np.argpartition(keys, count - 1)[:count])
+            top = top[np.argsort(keys[top], kind="stable")]
+        else:
+            top = np.argsort(keys, kind="stable")
+
+        spots = []
+        spot_index = SpotIndex(suppression_radius)
+        for index in top:
+            position = tuple(positions[index].tolist())
+            if spot_index.query(position) is None:
+                spot_index.add(position)
+                spots.append(
+                    {"position": position, "fitness": values[index].item(), "best_neighbour": -1}
+                )
+                if len(spots) == max_spots:
+                    return spots
+
+        # Suppression rejected too many of the best candidates, sort more of them
+        if len(top) == len(keys):
+            return spots
+        count *= 4
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""Coarse-to-fine pyramid search for Dispersive Fly Optimization (DFO) fitness matrices.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+
+from .spots import SpotIndex
+
+logger = logging.getLogger(__name__)
+
+# Number of rows of the source matrix reduced at once, so that huge memory maps are never
+# loaded (or converted to float) in full
+SLAB_ROWS = 256
+
+
+def downsample(matrix, factor: int, fitness_type: str = "max") -> np.ndarray:
+    """Reduce every ``factor``-sized block of a matrix to its best value.
+
+    Max-pooling (min-pooling for 'min' problems) keeps every peak of the matrix at the coarse
+    level, so a coarse swarm still finds the cells holding the fine peaks. Edges that do not
+    fill a whole block are padded with the worst value.
+
+    Args:
+        matrix: The N-dimensional fitness matrix.
+        factor (int): The reduction factor along every dimension.
+        fitness_type (str, optional): Either 'min' or 'max'. Defaults to "max".
+
+    Returns:
+        numpy.ndarray: The downsampled matrix, as float64.
+    """
+    reducer = np.min if fitness_type == "min" else np.max
+    worst = np.inf if fitness_type == "min" else -np.inf
+    shape = matrix.shape
+    coarse_shape = tuple(-(-extent // factor) for extent in shape)
+    coarse = np.empty(coarse_shape, dtype=np.float64)
+
+    slab = SLAB_ROWS * factor
+    for start in range(0, shape[0], slab):
+        block = np.asarray(matrix[start : start + slab], dtype=np.float64)
+        block = np.pad(
+            block,
+            [(0, (-extent) % factor) for extent in block.shape],
+            constant_values=worst,
+        )
+        blocks_shape = []
+        for extent in block.shape:
+            blocks_shape += [extent // factor, factor]
+        coarse[start // factor : start // factor + block.shape[0] // factor] = reducer(
+            block.reshape(blocks_shape), axis=tuple(range(1, 2 * block.ndim, 2))
+        )
+    return coarse
+
+
+def build_pyramid(
+    matrix, levels: int, factor: int = 2, fitness_type: str = "max"
+) -> List[np.ndarray]:
+    """Build the pyramid of a fitness matrix, from full resolution to the coarsest level.
+
+    Reduction stops early once a level would be smaller than ``factor`` along any dimension.
+
+    Args:
+        matrix: The N-dimensional fitness matrix.
+        levels (int): The maximum number of levels, including the full resolution one.
+        factor (int, optional): The reduction factor between two levels. Defaults to 2.
+        fitness_type (str, optional): Either 'min' or 'max'. Defaults to "max".
+
+    Returns:
+        list: The levels of the pyramid, the full resolution matrix first.
+    """
+    pyramid = [matrix]
+    while len(pyramid) < levels and min(pyramid[-1].shape) >= 2 * factor:
+        pyramid.append(downsample(pyramid[-1], factor, fitness_type))
+    return pyramid
+
+
+class PyramidSearch:
+    """Multi-resolution search of the dominant spots of a fitness matrix.
+
+    The swarm first runs on the coarsest level of the pyramid to find candidate spots. Each
+    candidate is then refined at every finer level by a small local swarm, confined to the
+    block the candidate covers plus a margin. The problem settings (population, iterations,
+    topology, fitness type...) are taken from the given DFO instance.
+    """
+
+    def __init__(
+        self,
+        dfo,
+        levels: int = 3,
+        factor: int = 2,
+        local_flies: int = 20,
+        margin: int = None,
+    ):
+        if dfo.fitness_func is not None or dfo.fitness_matrix is None:
+            raise ValueError("Pyramid search requires a fitness_matrix without fitness_func")
+        if not isinstance(levels, int) or levels <= 0:
+            raise ValueError("levels must be a positive integer")
+        if not isinstance(factor, int) or factor < 2:
+            raise ValueError("factor must be an integer greater than 1")
+        if not isinstance(local_flies, int) or local_flies <= 2:
+            raise ValueError("local_flies must be an integer greater than 2")
+
+        self.dfo = dfo
+        self.factor = factor
+        self.local_flies = local_flies
+        self.margin = factor if margin is None else margin
+        self.pyramid = build_pyramid(dfo.fitness_matrix, levels, factor, dfo.fitness_type)
+
+    def __swarm(self, matrix, num_flies: int):
+        """Build a DFO on (part of) a pyramid level with the settings of the main one."""
+        params = dict(
+            self.dfo.params,
+            fitness_matrix=matrix,
+            dims_range=list(matrix.shape),
+            num_flies=num_flies,
+            cache=None,
+            bounds=None,
+            seed=self.dfo.spawn_rngs(1)[0],
+            tabu_regions=None,
+            # Sub-swarms report to the statistics of the main DFO
+            stats=self.dfo.stats or False,
+        )
+        return type(self.dfo)(**params)
+
+    def refine(self, position: tuple, level: int) -> Dict:
+        """Refine a spot of a coarse level at the next finer level.
+
+        Args:
+            position (tuple): The position of the spot at level ``level + 1``.
+            level (int): The level to refine at.
+
+        Returns:
+            dict: The best fly found around the spot at that level, in its coordinates.
+        """
+        matrix = self.pyramid[level]
+        origin = [
+            max(0, coordinate * self.factor - self.margin) for coordinate in position
+        ]
+        end = [
+            min(extent, coordinate * self.factor + self.factor + self.margin)
+            for coordinate, extent in zip(position, matrix.shape)
+        ]
+        window = matrix[tuple(slice(low, high) for low, high in zip(origin, end))]
+        with self.__swarm(window, self.local_flies) as swarm:
+            best_fly, _ = swarm.search()
+        best_fly["position"] = tuple(
+            int(coordinate + low) for coordinate, low in zip(best_fly["position"], origin)
+        )
+        return best_fly
+
+    def run(
+        self,
+        max_spots: int = 5,
+        num_defaults_before_stop: int = 3,
+        suppression_radius: float = 0,
+        tabu_radius: float = None,
+        engine: str = "swarm",
+    ) -> List[Dict]:
+        """Find up to ``max_spots`` dominant spots, coarse to fine.
+
+        Args:
+            max_spots (int, optional): The maximum number of dominant spots. Defaults to 5.
+            num_defaults_before_stop (int, optional): The number of consecutive defaults of
+                the coarse run before stopping. Defaults to 3.
+            suppression_radius (float, optional): The distance within which two spots are the
+                same, at full resolution. Defaults to 0.
+            tabu_radius (float, optional): The radius of the basins masked around spots of the
+                coarse run, at full resolution. Defaults to None.
+            engine (str, optional): The engine of the coarse run, see DFO.run(). The coarse
+                level is small, so 'auto' would scan it exactly. Defaults to "swarm".
+
+        Returns:
+            list: The dominant spots, as fly dictionaries at full resolution.
+        """
+        coarsest = len(self.pyramid) - 1
+        scale = self.factor**coarsest
+        candidates = self.__swarm(self.pyramid[-1], self.dfo.num_flies).run(
+            max_spots,
+            num_defaults_before_stop,
+            suppression_radius=suppression_radius / scale,
+            tabu_radius=None if tabu_radius is None else tabu_radius / scale,
+            engine=engine,
+        )
+
+        dominant_spots = []
+        spot_index = SpotIndex(suppression_radius)
+        for candidate in candidates:
+            spot = candidate
+            for level in range(coarsest - 1, -1, -1):
+                spot = self.refine(spot["position"], level)
+            if spot_index.query(spot["position"]) is None:
+                spot_index.add(spot["position"])
+                dominant_spots.append(spot)
+            else:
+                logger.warning(f"Fly {spot} is already in the dominant spots")
+        return dominant_spots
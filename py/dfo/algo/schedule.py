@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Disturbance and population schedules for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def diversity(dfo) -> float:
+    """Get the diversity of a swarm, relative to the extent of the search space.
+
+    This is the median distance of the flies to the best fly, along the dimension where it is
+    largest. Unlike the spread, it ignores the few flies just restarted by the disturbance.
+
+    Args:
+        dfo (DFO): The swarm.
+
+    Returns:
+        float: The diversity, from 0 (most flies share the best position) to 1.
+    """
+    extent = np.maximum(dfo.upper_bounds - dfo.lower_bounds, 1e-12)
+    offsets = np.abs(dfo.positions - dfo.positions[dfo.best_fly_index].astype(dfo.work_dtype))
+    return float((np.median(offsets, axis=0) / extent).max())
+
+
+class DisturbanceSchedule:
+    """Fixed disturbance threshold, the base class of the disturbance schedules.
+
+    A schedule holds no state of its own: the current threshold is the ``cut_off`` of the
+    DFO, which update() is given after every epoch.
+    """
+
+    name = "fixed"
+
+    def __init__(self, cut_off: float = 0.002):
+        """
+        Args:
+            cut_off (float, optional): The disturbance threshold of a new swarm.
+                Defaults to 0.002.
+        """
+        if not 0 <= cut_off <= 1:
+            raise ValueError("cut_off must be between 0 and 1")
+        self.cut_off = cut_off
+
+    def update(self, dfo) -> float:
+        """Get the disturbance threshold of the next epoch.
+
+        Args:
+            dfo (DFO): The swarm, after its best fly and neighbours were updated.
+
+        Returns:
+            float: The new disturbance threshold.
+        """
+        return self.cut_off
+
+
+class AdaptiveDisturbance(DisturbanceSchedule):
+    """Disturbance threshold following the diversity of the swarm.
+
+    While the swarm is young, a diversity collapse with no improvement of the best fitness is
+    taken as premature and the threshold is raised, restarting more coordinates at random.
+    Otherwise the threshold falls back, towards a target annealed from ``cut_off`` down to
+    ``min_cut_off`` over ``max_iter`` epochs, so the swarm can settle as it converges.
+    """
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        cut_off: float = 0.002,
+        min_cut_off: float = 0.0005,
+        max_cut_off: float = 0.02,
+        factor: float = 1.5,
+        collapse: float = 0.01,
+        premature: float = 0.1,
+    ):
+        """
+        Args:
+            cut_off (float, optional): The disturbance threshold of a new swarm.
+                Defaults to 0.002.
+            min_cut_off (float, optional): The threshold at the end of the annealing.
+                Defaults to 0.0005.
+            max_cut_off (float, optional): The highest threshold. Defaults to 0.02.
+            factor (float, optional): The rate at which the threshold rises and falls, per
+                epoch. Defaults to 1.5.
+            collapse (float, optional): The diversity below which the swarm has collapsed.
+                Defaults to 0.01.
+            premature (float, optional): The fraction of ``max_iter`` epochs within which a
+                collapse is premature. Defaults to 0.1.
+        """
+        super().__init__(cut_off)
+        if not 0 <= min_cut_off <= cut_off <= max_cut_off <= 1:
+            raise ValueError("min_cut_off <= cut_off <= max_cut_off must be within [0, 1]")
+        if factor <= 1:
+            raise ValueError("factor must be greater than 1")
+        self.min_cut_off = min_cut_off
+        self.max_cut_off = max_cut_off
+        self.factor = factor
+        self.collapse = collapse
+        self.premature = premature
+
+    def update(self, dfo) -> float:
+        progress = min(dfo.epoch / dfo.max_iter, 1.0)
+        if (
+            progress < self.premature
+            and dfo.stagnant_epochs > 0
+            and diversity(dfo) <= self.collapse
+        ):
+            return min(dfo.cut_off * self.factor, self.max_cut_off)
+        target = self.cut_off + (self.min_cut_off - self.cut_off) * progress
+        return max(dfo.cut_off / self.factor, target)
+
+
+class ShrinkingPopulation:
+    """Population schedule retiring redundant flies once the swarm is tight.
+
+    When the diversity of the swarm falls to ``tightness``, a ``rate`` of the flies is
+    retired every epoch, down to ``min_flies``: flies sharing the position of another one
+    first, then the worst ones. A tight swarm needs fewer flies to pin its spot down, and
+    every retired fly is one fitness evaluation less per epoch. The population is restored
+    by the next restart.
+    """
+
+    name = "shrink"
+
+    def __init__(self, min_flies: int = 10, tightness: float = 0.05, rate: float = 0.25):
+        """
+        Args:
+            min_flies (int, optional): The smallest population. Defaults to 10.
+            tightness (float, optional): The diversity below which flies are retired.
+                Defaults to 0.05.
+            rate (float, optional): The fraction of the flies retired per epoch.
+                Defaults to 0.25.
+        """
+        if not isinstance(min_flies, int) or min_flies < 2:
+            raise ValueError("min_flies must be an integer of at least 2")
+        if not 0 < rate < 1:
+            raise ValueError("rate must be between 0 and 1")
+        self.min_flies = min_flies
+        self.tightness = tightness
+        self.rate = rate
+
+    def select(self, dfo) -> np.ndarray | None:
+        """Select the flies that stay in the swarm.
+
+        Args:
+            dfo (DFO): The swarm, after its best fly and neighbours were updated.
+
+        Returns:
+            numpy.ndarray or None: The sorted indices of the flies to keep, or None to keep
+            them all.
+        """
+        if dfo.num_flies <= self.min_flies or diversity(dfo) > self.tightness:
+            return None
+        keep = max(self.min_flies, int(dfo.num_flies * (1 - self.rate)))
+
+        # Unique positions first, then the best fitness, ties by index
+        _, first = np.unique(dfo.positions, axis=0, return_index=True)
+        duplicate = np.ones(dfo.num_flies, dtype=bool)
+        duplicate[first] = False
+        fitness = dfo.fitness if dfo.fitness_type == "min" else -dfo.fitness
+        order = np.lexsort((fitness, duplicate))
+        return np.sort(order[:keep])
+
+
+DISTURBANCE_SCHEDULES = {
+    DisturbanceSchedule.name: DisturbanceSchedule,
+    AdaptiveDisturbance.name: AdaptiveDisturbance,
+}
+
+
+def get_disturbance_schedule(schedule: str | float | DisturbanceSchedule) -> DisturbanceSchedule:
+    """Get a disturbance schedule from its name or fixed threshold, or return the given one.
+
+    Args:
+        schedule (str, float or DisturbanceSchedule): Either 'fixed' or 'adaptive', a fixed
+            threshold, or a DisturbanceSchedule instance.
+
+    Returns:
+        DisturbanceSchedule: The schedule instance.
+
+    Raises:
+        ValueError: If the schedule is unknown.
+    """
+    if isinstance(schedule, DisturbanceSchedule):
+        return schedule
+    if isinstance(schedule, (int, float)) and not isinstance(schedule, bool):
+        return DisturbanceSchedule(schedule)
+    if isinstance(schedule, str) and schedule.lower() in DISTURBANCE_SCHEDULES:
+        return DISTURBANCE_SCHEDULES[schedule.lower()]()
+    raise ValueError(
+        f"disturbance must be a DisturbanceSchedule, a threshold or one of "
+        f"{', '.join(DISTURBANCE_SCHEDULES)}"
+    )
+
+
+def get_population_schedule(schedule: str | ShrinkingPopulation | None) -> ShrinkingPopulation:
+    """Get a population schedule from its name, or return the given one.
+
+    Args:
+        schedule (str, ShrinkingPopulation or None): None for a constant population, 'shrink',
+            or a ShrinkingPopulation instance.
+
+    Returns:
+        ShrinkingPopulation or None: The schedule instance, None for a constant population.
+
+    Raises:
+        ValueError: If the schedule is unknown.
+    """
+    if schedule is None or isinstance(schedule, ShrinkingPopulation):
+        return schedule
+    if isinstance(schedule, str) and schedule.lower() == ShrinkingPopulation.name:
+        return ShrinkingPopulation()
+    raise ValueError(
+        f"population must be None, a ShrinkingPopulation or '{ShrinkingPopulation.name}'"
+    )
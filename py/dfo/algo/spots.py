@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Spatial index of the dominant spots found by the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import itertools
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Above this many neighbouring grid cells, a vectorized scan of the spots is cheaper
+MAX_NEIGHBOUR_CELLS = 729
+
+
+class SpotIndex:
+    """Grid-hash index of spot positions for non-maximum suppression.
+
+    Positions are hashed into cubic cells of side ``radius``, so the spots within ``radius``
+    of a position can only lie in the 3^dims cells around it. In high dimensions, where
+    there are too many neighbouring cells, the index falls back to a vectorized distance
+    scan. A radius of 0 only matches identical positions, with a plain hash lookup.
+    """
+
+    def __init__(self, radius: float = 0):
+        if not isinstance(radius, (int, float)) or radius < 0:
+            raise ValueError("radius must be a non-negative number")
+
+        self.radius = radius
+        self.cells: Dict[Tuple, List[int]] = {}
+        self.positions: List[Tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, position: Tuple) -> int:
+        """Add a spot position to the index.
+
+        Args:
+            position (tuple): The position of the spot.
+
+        Returns:
+            int: The index of the new spot.
+        """
+        index = len(self.positions)
+        self.positions.append(tuple(position))
+        self.cells.setdefault(self.__cell(position), []).append(index)
+        return index
+
+    def query(self, position: Tuple) -> int | None:
+        """Find the nearest indexed spot within ``radius`` of a position.
+
+        Args:
+            position (tuple): The position to look up.
+
+        Returns:
+            int or None: The index of the nearest spot within the radius, None if there is none.
+        """
+        if not self.positions:
+            return None
+
+        if self.radius == 0:
+            for index in self.cells.get(self.__cell(position), []):
+                if self.positions[index] == tuple(position):
+                    return index
+            return None
+
+        if 3 ** len(position) <= MAX_NEIGHBOUR_CELLS:
+            cell = self.__cell(position)
+            candidates = [
+                index
+                for offset in itertools.product((-1, 0, 1), repeat=len(position))
+                for index in self.cells.get(tuple(c + o for c, o in zip(cell, offset)), [])
+            ]
+        else:
+            candidates = list(range(len(self.positions)))
+        if not candidates:
+            return None
+
+        distances = np.linalg.norm(
+            np.asarray([self.positions[index] for index in candidates], dtype=np.float64)
+            - np.asarray(position, dtype=np.float64),
+            axis=1,
+        )
+        nearest = int(np.argmin(distances))
+        return candidates[nearest] if distances[nearest] <= self.radius else None
+
+    def replace(self, index: int, position: Tuple):
+        """Move an indexed spot to a new position.
+
+        Args:
+            index (int): The index of the spot.
+            position (tuple): The new position of the spot.
+        """
+        self.cells[self.__cell(self.positions[index])].remove(index)
+        self.positions[index] = tuple(position)
+        self.cells.setdefault(self.__cell(position), []).append(index)
+
+    def __cell(self, position: Tuple) -> Tuple:
+        if self.radius == 0:
+            return tuple(position)
+        return tuple(int(c) for c in np.floor(np.asarray(position, dtype=np.float64) / self.radius))
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Run statistics and phase timers for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import functools
+import logging
+import time
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# The DFO methods timed under each phase
+PHASES = {
+    "fitness": ("calculate_population_fitness", "calculate_fitness"),
+    "dispersal": ("dispersed_positions",),
+    "find_best_neighbour": ("find_best_neighbour",),
+    "get_best_fly_index": ("get_best_fly_index",),
+    "check_convergence": ("check_convergence",),
+}
+
+
+class RunStats:
+    """Cumulative statistics of a DFO instance.
+
+    The phases are timed by wrapping the DFO methods of the instance, so a DFO built
+    without statistics runs the plain methods and pays nothing. Counters are updated once
+    per population, not once per fly.
+    """
+
+    def __init__(self):
+        self.phase_times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.phase_calls: Dict[str, int] = dict.fromkeys(PHASES, 0)
+        self.evaluations = 0
+        self.search_epochs: List[int] = []
+        self.unconverged_searches = 0
+        self.duplicate_searches = 0
+        self.tabu_rim_searches = 0
+        # Schedules, sampled after every epoch
+        self.scheduled_epochs = 0
+        self.cut_off_total = 0.0
+        self.cut_off_range = [float("inf"), 0.0]
+        self.fly_epochs = 0
+        self.retired_flies = 0
+        self.__dfo = None
+
+    def __getstate__(self):
+        # Statistics sent back by worker processes leave their DFO behind
+        return dict(self.__dict__, _RunStats__dfo=None)
+
+    def instrument(self, dfo):
+        """Time the phases of a DFO instance.
+
+        Several instances, e.g. the sub-swarms of a pyramid search, can share the statistics.
+        The cache and thread pool statistics are those of the first one.
+
+        Args:
+            dfo (DFO): The instance to instrument.
+        """
+        if self.__dfo is None:
+            self.__dfo = dfo
+        for phase, names in PHASES.items():
+            for name in names:
+                setattr(dfo, name, self.timed(phase, getattr(dfo, name)))
+
+    def timed(self, phase: str, func: Callable) -> Callable:
+        """Wrap a function so that its calls are timed under a phase."""
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.phase_times[phase] += time.perf_counter() - start
+                self.phase_calls[phase] += 1
+
+        return wrapper
+
+    def merge(self, other: "RunStats"):
+        """Add the statistics of another instance, e.g. those of a worker process."""
+        for phase in PHASES:
+            self.phase_times[phase] += other.phase_times[phase]
+            self.phase_calls[phase] += other.phase_calls[phase]
+        self.evaluations += other.evaluations
+        self.search_epochs.extend(other.search_epochs)
+        self.unconverged_searches += other.unconverged_searches
+        self.duplicate_searches += other.duplicate_searches
+        self.tabu_rim_searches += other.tabu_rim_searches
+        self.scheduled_epochs += other.scheduled_epochs
+        self.cut_off_total += other.cut_off_total
+        self.cut_off_range = [
+            min(self.cut_off_range[0], other.cut_off_range[0]),
+            max(self.cut_off_range[1], other.cut_off_range[1]),
+        ]
+        self.fly_epochs += other.fly_epochs
+        self.retired_flies += other.retired_flies
+
+    def record_epoch(self, cut_off: float, num_flies: int):
+        """Record the disturbance threshold and population size after an epoch."""
+        self.scheduled_epochs += 1
+        self.cut_off_total += cut_off
+        low, high = self.cut_off_range
+        self.cut_off_range = [min(low, cut_off), max(high, cut_off)]
+        self.fly_epochs += num_flies
+
+    def record_search(self, epochs: int):
+        """Record the number of epochs of a finished search."""
+        self.search_epochs.append(epochs)
+
+    def to_dict(self) -> Dict:
+        """Export the statistics as a JSON-serialisable dictionary.
+
+        Returns:
+            dict: The phase timings and call counts, the evaluation and search counters, the
+            disturbance threshold and population schedules, and the cache and thread pool
+            statistics of the instrumented DFO.
+        """
+        searches = len(self.search_epochs)
+        stats = {
+            "phase_times": dict(self.phase_times),
+            "phase_calls": dict(self.phase_calls),
+            "evaluations": self.evaluations,
+            "searches": searches,
+            "search_epochs": list(self.search_epochs),
+            "mean_search_epochs": sum(self.search_epochs) / searches if searches else 0.0,
+            "unconverged_searches": self.unconverged_searches,
+            "duplicate_searches": self.duplicate_searches,
+            "tabu_rim_searches": self.tabu_rim_searches,
+            "mean_search_evaluations": self.evaluations / searches if searches else 0.0,
+        }
+        epochs = self.scheduled_epochs
+        if epochs:
+            stats["disturbance"] = {
+                "mean_cut_off": self.cut_off_total / epochs,
+                "min_cut_off": self.cut_off_range[0],
+                "max_cut_off": self.cut_off_range[1],
+            }
+            stats["population"] = {
+                "mean_flies": self.fly_epochs / epochs,
+                "retired_flies": self.retired_flies,
+            }
+        dfo = self.__dfo
+        if dfo is not None and dfo.cache is not None:
+            stats["cache"] = dfo.cache.stats()
+        if dfo is not None and dfo.thread_stats["calls"]:
+            stats["thread_speedup"] = dfo.get_thread_speedup()
+        return stats
+
+    def reset(self):
+        """Reset every statistic, keeping the instrumentation."""
+        dfo = self.__dfo
+        self.__init__()
+        self.__dfo = dfo
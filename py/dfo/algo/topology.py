@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""Neighbourhood topologies for the Dispersive Fly Optimization (DFO) algorithm.
+
+@Author     : Dr Prashant Aparajeya
+                Founder & Director @AISimply Ltd
+                Computer Vision Scientist
+                London, United Kingdom
+
+@Copyright  : Copyright 2024 - present
+@Project    : Dispersive Flies Optimization (DFO) Algorithm
+"""
+
+import logging
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Topology:
+    """Base class of the neighbourhood topologies.
+
+    A topology precomputes, once per population size, a ``(num_flies, k)`` table holding
+    the indices of the neighbours of every fly. Finding the best neighbour of the whole
+    population is then a single gather and arg-min/max over that table.
+    """
+
+    name = "topology"
+
+    def __init__(self):
+        self.tables: Dict[int, np.ndarray] = {}
+
+    def build(self, num_flies: int) -> np.ndarray:
+        """Build the neighbour index table for a population size.
+
+        Args:
+            num_flies (int): The number of flies in the population.
+
+        Returns:
+            numpy.ndarray: A ``(num_flies, k)`` array of neighbour indices.
+        """
+        raise NotImplementedError
+
+    def neighbours(self, num_flies: int) -> np.ndarray:
+        """Get the (cached) neighbour index table for a population size.
+
+        Args:
+            num_flies (int): The number of flies in the population.
+
+        Returns:
+            numpy.ndarray: A ``(num_flies, k)`` array of neighbour indices.
+        """
+        if num_flies not in self.tables:
+            self.tables[num_flies] = self.build(num_flies)
+        return self.tables[num_flies]
+
+    def best_neighbours(self, fitness: np.ndarray, fitness_type: str = "max") -> np.ndarray:
+        """Get the index of the best neighbour of every fly.
+
+        Ties are resolved in favour of the first neighbour of the table. The fitness may have
+        leading batch dimensions, e.g. ``(swarms, num_flies)`` for several swarms at once.
+
+        Args:
+            fitness (numpy.ndarray): The fitness of every fly, along the last axis.
+            fitness_type (str, optional): Either 'min' or 'max'. Defaults to "max".
+
+        Returns:
+            numpy.ndarray: The index of the best neighbour of every fly, shaped as the fitness.
+        """
+        num_flies = fitness.shape[-1]
+        table = self.neighbours(num_flies)
+        neighbour_fitness = fitness[..., table]
+        if fitness_type == "min":
+            best = np.argmin(neighbour_fitness, axis=-1)
+        else:
+            best = np.argmax(neighbour_fitness, axis=-1)
+        return table[np.arange(num_flies), best]
+
+
+class RingTopology(Topology):
+    """Ring topology where every fly sees the ``k`` flies on each side of it.
+
+    With ``k=1`` this is the classic DFO neighbourhood (the left and right flies). The right
+    neighbour comes first in the table, so it wins ties as in the original algorithm.
+    """
+
+    name = "ring"
+
+    def __init__(self, k: int = 1):
+        super().__init__()
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("k must be a positive integer")
+        self.k = k
+
+    def build(self, num_flies: int) -> np.ndarray:
+        indices = np.arange(num_flies)[:, None]
+        offsets = np.ravel(np.column_stack([np.arange(1, self.k + 1), -np.arange(1, self.k + 1)]))
+        return (indices + offsets) % num_flies
+
+
+class VonNeumannTopology(Topology):
+    """Von Neumann topology: flies sit on a toroidal grid and see their 4 grid neighbours.
+
+    The grid has as many rows as the largest divisor of ``num_flies`` that is not greater
+    than its square root. A prime population size has a single row, whose up and down
+    neighbours would be the flies themselves, so it falls back to the ring topology.
+    """
+
+    name = "von_neumann"
+
+    def build(self, num_flies: int) -> np.ndarray:
+        rows = max(
+            r for r in range(1, int(np.sqrt(num_flies)) + 1) if num_flies % r == 0
+        )
+        if rows == 1:
+            return RingTopology().build(num_flies)
+        cols = num_flies // rows
+        row, col = np.divmod(np.arange(num_flies), cols)
+        return np.column_stack(
+            [
+                row * cols + (col + 1) % cols,
+                row * cols + (col - 1) % cols,
+                ((row + 1) % rows) * cols + col,
+                ((row - 1) % rows) * cols + col,
+            ]
+        )
+
+
+class RandomRegularTopology(Topology):
+    """Random topology where every fly sees ``degree`` distinct, randomly chosen other flies."""
+
+    name = "random"
+
+    def __init__(self, degree: int = 3, seed: int | np.random.Generator = None):
+        super().__init__()
+        if not isinstance(degree, int) or degree <= 0:
+            raise ValueError("degree must be a positive integer")
+        self.degree = degree
+        self.seed = seed
+
+    def build(self, num_flies: int) -> np.ndarray:
+        if self.degree >= num_flies:
+            raise ValueError("degree must be smaller than the number of flies")
+        rng = np.random.default_rng(self.seed)
+        # Draw among the other flies by skipping over the fly itself
+        others = np.argsort(rng.random((num_flies, num_flies - 1)), axis=1)[:, : self.degree]
+        indices = np.arange(num_flies)[:, None]
+        return others + (others >= indices)
+
+
+class GlobalTopology(Topology):
+    """Global topology: every fly sees the whole population, i.e. the best fly."""
+
+    name = "global"
+
+    def build(self, num_flies: int) -> np.ndarray:
+        return np.broadcast_to(np.arange(num_flies), (num_flies, num_flies))
+
+    def best_neighbours(self, fitness: np.ndarray, fitness_type: str = "max") -> np.ndarray:
+        # No need to gather a (num_flies, num_flies) table, everyone follows the best fly
+        if fitness_type == "min":
+            best = np.argmin(fitness, axis=-1)
+        else:
+            best = np.argmax(fitness, axis=-1)
+        return np.broadcast_to(np.expand_dims(best, -1), fitness.shape).copy()
+
+
+TOPOLOGIES = {
+    RingTopology.name: RingTopology,
+    VonNeumannTopology.name: VonNeumannTopology,
+    RandomRegularTopology.name: RandomRegularTopology,
+    GlobalTopology.name: GlobalTopology,
+}
+
+
+def get_topology(
+    topology: str | Topology, seed: int | np.random.Generator = None
+) -> Topology:
+    """Get a topology instance from its name or return the given instance.
+
+    Args:
+        topology (str or Topology): One of 'ring', 'von_neumann', 'random' and 'global', or a
+            Topology instance.
+        seed (int or numpy.random.Generator, optional): The random stream of a 'random'
+            topology built from its name. Defaults to None.
+
+    Returns:
+        Topology: The topology instance.
+
+    Raises:
+        ValueError: If the topology is unknown.
+    """
+    if isinstance(topology, Topology):
+        return topology
+    if isinstance(topology, str) and topology.lower() == RandomRegularTopology.name:
+        return RandomRegularTopology(seed=seed)
+    if isinstance(topology, str) and topology.lower() in TOPOLOGIES:
+        return TOPOLOGIES[topology.lower()]()
+    raise ValueError(
+        f"topology must be a Topology or one of {', '.join(TOPOLOGIES)}"
+    )
@@ -85,6 +85,10 @@ class RedisManager:
             return await self.client.ttl(cache_key)
         return 0
         
+    async def get_checkpoint(self, cache_key: str) -> bytes | None:
+        # Get the raw bytes of a DFO checkpoint, see DFO.load_checkpoint()
+        return await self.client.get(cache_key)
+
     def get_lock(self, cache_key: str):
         return self.client.lock(self.lock_key(cache_key))
                 
@@ -114,6 +118,13 @@ class RedisManager:
         if expire <= 0:
             await self.client.persist(cache_key)
 
+    async def set_checkpoint(self, cache_key: str, checkpoint: bytes, expire: float = 0):
+        # Store the raw bytes of a DFO checkpoint, without pickling, so another worker can resume the run
+        if expire > 0:
+            await self.client.set(cache_key, checkpoint, ex=expire)
+        else:
+            await self.client.set(cache_key, checkpoint)
+
     async def set_json(
         self, cache_key: str, value: dict, expire: float = settings.REDIS_EXPIRY
     ):